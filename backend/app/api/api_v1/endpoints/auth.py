@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import create_access_token, get_password_hash, verify_password
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.api.deps import get_current_user_record
+from app.core.security import create_access_token, password_hasher, PasswordHasherBusy
 from app.models.user import User
 from app.schemas.user import UserCreate, User as UserSchema
 from datetime import timedelta
@@ -10,14 +12,21 @@ from app.core.config import settings
 
 router = APIRouter()
 
+def _busy(error: PasswordHasherBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Trop d'authentifications en cours, réessayez plus tard",
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
 @router.post("/register", response_model=UserSchema)
 async def register(
     user_in: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Enregistre un nouvel utilisateur"""
     # Vérifier si l'utilisateur existe déjà
-    user = db.query(User).filter(User.email == user_in.email).first()
+    user = await db.scalar(select(User).where(User.email == user_in.email))
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -25,7 +34,10 @@ async def register(
         )
     
     # Créer le nouvel utilisateur
-    hashed_password = get_password_hash(user_in.password)
+    try:
+        hashed_password = await password_hasher.hash(user_in.password)
+    except PasswordHasherBusy as e:
+        raise _busy(e)
     db_user = User(
         email=user_in.email,
         full_name=user_in.full_name,
@@ -34,20 +46,27 @@ async def register(
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 @router.post("/login")
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Authentifie un utilisateur"""
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.scalar(select(User).where(User.email == form_data.username))
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+        except PasswordHasherBusy as e:
+            raise _busy(e)
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou mot de passe incorrect",
@@ -60,6 +79,12 @@ async def login(
             detail="Utilisateur inactif"
         )
     
+    # Coût bcrypt modifié depuis le dernier hash : mise à jour transparente
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        await db.refresh(user)
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
@@ -73,7 +98,7 @@ async def login(
 
 @router.get("/me", response_model=UserSchema)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_record)
 ):
     """Récupère les informations de l'utilisateur connecté"""
     return current_user 
\ No newline at end of file
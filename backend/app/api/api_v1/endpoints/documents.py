@@ -1,39 +1,138 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.core.database import get_db
-from app.schemas.document import Document, DocumentCreate, DocumentUpdate, DocumentWithTemplate
-from app.models.document import Document as DocumentModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional
+import anyio
+import asyncio
+import json
+import os
+import time
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.responses import FastJSONResponse, rows_response
+from app.schemas.document import Document, DocumentCreate, DocumentUpdate, DocumentWithTemplate, DocumentSummary, DocumentSearchResult, DocumentBulkExport, DocumentContentPatch, DocumentContentPatchResult
+from app.schemas.generation_job import GenerationJob
+from app.models.document import Document as DocumentModel, DocumentStatus
 from app.services.ai_service import AIService
+from app.services.content_delta import DeltaError, VersionConflict, patch_content
+from app.services.document_listing import attach_template_names, full_query, serialize_summaries, summary_query
 from app.services.document_service import DocumentService
+from app.services.etag import CACHE_CONTROL, check_if_match, entity_etag, is_not_modified
+from app.services.export_service import export_engine, ExportQueueFull, SUPPORTED_FORMATS, MEDIA_TYPES
+from app.services.bulk_export import stream_zip_archive
+from app.services.job_service import JobService
+from app.services.llm_client import LLMUserLimitExceeded
+from app.services.pagination import InvalidCursor, keyset_page, split_page
+from app.services.search_service import search_documents
+from app.services.write_buffer import draft_write_buffer
 from app.api.deps import get_current_user
 from app.models.user import User
 
 router = APIRouter()
 ai_service = AIService()
 document_service = DocumentService()
+job_service = JobService()
 
-@router.get("/", response_model=List[DocumentWithTemplate])
+def _generation_payload(document: DocumentModel) -> dict:
+    """Paramètres de génération figés au moment de la soumission du job"""
+    return {
+        "template_content": "",  # À adapter selon le template
+        "template_data": document.template_data,
+        "document_type": document.document_type.value
+    }
+
+@router.get(
+    "/",
+    response_model=List[DocumentWithTemplate],
+    responses={200: {"model": List[DocumentSummary], "description": "Avec view=summary"}}
+)
 async def get_documents(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     document_type: Optional[str] = None,
-    db: Session = Depends(get_db),
+    view: str = "full",
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Récupère la liste des documents de l'utilisateur"""
-    query = db.query(DocumentModel).filter(DocumentModel.user_id == current_user.id)
+    """
+    Récupère la liste des documents de l'utilisateur, du plus récent au plus ancien
+
+    La page suivante s'obtient en repassant l'en-tête X-Next-Cursor dans
+    `cursor` ; `skip` reste accepté pour les anciens clients. Avec
+    `view=summary`, seules les colonnes de liste sont lues et renvoyées
+    (sans `content` ni `template_data`).
+    """
+    if view not in ("full", "summary"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Vue non supportée. Utilisez 'full' ou 'summary'"
+        )
+    
+    await draft_write_buffer.flush_user(db, current_user.id)
+    
+    if view == "summary":
+        query = summary_query(current_user.id)
+    else:
+        query = full_query(current_user.id)
     
     if document_type:
-        query = query.filter(DocumentModel.document_type == document_type)
+        query = query.where(DocumentModel.document_type == document_type)
+    
+    try:
+        query = keyset_page(query, DocumentModel, cursor, limit, db.bind.dialect.name)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if skip:
+        query = query.offset(skip)
+    
+    rows = (await db.execute(query)).all()
+    if view == "full":
+        # Lignes (Document, template_name) : le curseur se lit sur le document
+        rows = attach_template_names(rows)
+    rows, next_cursor = split_page(rows, limit)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
     
-    documents = query.offset(skip).limit(limit).all()
-    return documents
+    if view == "summary":
+        return FastJSONResponse(serialize_summaries(rows), headers=headers)
+    return rows_response(rows, DocumentWithTemplate, headers)
+
+@router.get("/search", response_model=List[DocumentSearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    document_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Recherche plein texte dans les documents de l'utilisateur
+
+    Porte sur le titre, le contenu et les valeurs de template_data ; les
+    résultats sont classés par pertinence avec un extrait surligné.
+    """
+    await draft_write_buffer.flush_user(db, current_user.id)
+    try:
+        results = await search_documents(db, current_user.id, q, limit, document_type)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Type de document non supporté"
+        )
+    except NotImplementedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=str(e)
+        )
+    return FastJSONResponse(results)
 
 @router.post("/", response_model=Document)
 async def create_document(
     document: DocumentCreate,
-    db: Session = Depends(get_db),
+    response: Response,
+    background: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Crée un nouveau document"""
@@ -42,6 +141,15 @@ async def create_document(
         user_id=current_user.id
     )
     
+    # Génération confiée au worker : le document est créé sans attendre l'IA
+    if document.template_data and background:
+        db.add(db_document)
+        await db.commit()
+        await db.refresh(db_document)
+        job = await job_service.enqueue(db, db_document, payload=_generation_payload(db_document))
+        response.headers["X-Generation-Job"] = str(job.id)
+        return db_document
+    
     # Si des données de template sont fournies, générer le contenu
     if document.template_data:
         try:
@@ -49,9 +157,15 @@ async def create_document(
             content = await ai_service.generate_document_content(
                 template_content="",  # À adapter selon le template
                 template_data=document.template_data,
-                document_type=document.document_type.value
+                document_type=document.document_type.value,
+                user_id=current_user.id
             )
             db_document.content = content
+        except LLMUserLimitExceeded as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(e)
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -59,42 +173,126 @@ async def create_document(
             )
     
     db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
+    await db.commit()
+    await db.refresh(db_document)
     return db_document
 
 @router.get("/{document_id}", response_model=DocumentWithTemplate)
 async def get_document(
     document_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Récupère un document spécifique"""
-    document = db.query(DocumentModel).filter(
-        DocumentModel.id == document_id,
-        DocumentModel.user_id == current_user.id
-    ).first()
+    """
+    Récupère un document spécifique
+
+    Avec If-None-Match, répond 304 sans lire ni sérialiser le contenu si
+    le document n'a pas changé.
+    """
+    await draft_write_buffer.flush_document(db, document_id)
+    version = (await db.execute(
+        select(DocumentModel.id, DocumentModel.created_at, DocumentModel.updated_at).where(
+            DocumentModel.id == document_id,
+            DocumentModel.user_id == current_user.id
+        )
+    )).first()
     
-    if not document:
+    if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document non trouvé"
         )
     
+    etag = entity_etag("document", *version)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    document = await db.scalar(select(DocumentModel).where(DocumentModel.id == document_id))
+    response.headers.update(headers)
     return document
 
 @router.put("/{document_id}", response_model=Document)
 async def update_document(
     document_id: int,
     document_update: DocumentUpdate,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    buffered: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Met à jour un document"""
-    db_document = db.query(DocumentModel).filter(
+    """
+    Met à jour un document
+
+    Avec If-Match, l'écriture est refusée (412) si le document a été
+    modifié depuis la version lue par le client (autre onglet, worker...).
+
+    Avec `buffered=true` (sauvegarde automatique), la mise à jour d'un
+    brouillon est fusionnée en mémoire et écrite au prochain flush : la
+    réponse est un 202 avec la version qu'aura le document. Un changement
+    de statut ou un If-Match repasse par l'écriture directe.
+
+    L'en-tête X-Document-Version (version reçue du GET ou du dernier 202)
+    fait refuser (409) une écriture tamponnée partie d'une version
+    dépassée. Une rafale rejetée au flush est signalée par un 409 à
+    l'écriture tamponnée suivante et par GET /{document_id}/draft. Les
+    lectures servies par un autre worker peuvent précéder le flush de
+    DRAFT_WRITE_FLUSH_INTERVAL secondes au plus.
+    """
+    fields = document_update.dict(exclude_unset=True)
+    
+    if (buffered and settings.DRAFT_WRITE_BUFFER_ENABLED
+            and "status" not in fields and not request.headers.get("if-match")):
+        client_version = _client_version(request)
+        conflict = draft_write_buffer.take_conflict(document_id, current_user.id)
+        if conflict is not None:
+            raise _version_conflict(conflict.version)
+        
+        # Seule la première écriture d'une rafale lit la base
+        versions = draft_write_buffer.pending_versions(document_id, current_user.id)
+        if versions is not None:
+            current_status, base_version = DocumentStatus.DRAFT, versions[0]
+            if client_version is not None and client_version not in versions:
+                raise _version_conflict(versions[1])
+        else:
+            # Un flush en cours de ce document doit être validé avant de lire sa version
+            await draft_write_buffer.flush_document(db, document_id)
+            current = (await db.execute(select(DocumentModel.status, DocumentModel.version).where(
+                DocumentModel.id == document_id,
+                DocumentModel.user_id == current_user.id
+            ))).first()
+            if current is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Document non trouvé"
+                )
+            current_status, base_version = current
+            if client_version is not None and client_version != base_version:
+                raise _version_conflict(base_version)
+        
+        if current_status == DocumentStatus.DRAFT:
+            writes, version = draft_write_buffer.put(document_id, current_user.id, base_version, fields)
+            if draft_write_buffer.full:
+                await draft_write_buffer.flush(db=db)
+            return FastJSONResponse(
+                {"id": document_id, "pending": True, "buffered_writes": writes, "version": version},
+                status_code=status.HTTP_202_ACCEPTED,
+                headers={"X-Document-Version": str(version)}
+            )
+    
+    await draft_write_buffer.flush_document(db, document_id)
+    query = select(DocumentModel).where(
         DocumentModel.id == document_id,
         DocumentModel.user_id == current_user.id
-    ).first()
+    )
+    if request.headers.get("if-match"):
+        # Verrou de ligne jusqu'au commit : pas d'écriture concurrente entre
+        # la vérification et l'enregistrement
+        query = query.with_for_update()
+    db_document = await db.scalar(query)
     
     if not db_document:
         raise HTTPException(
@@ -102,24 +300,97 @@ async def update_document(
             detail="Document non trouvé"
         )
     
-    for field, value in document_update.dict(exclude_unset=True).items():
+    check_if_match(request, entity_etag("document", db_document.id, db_document.created_at, db_document.updated_at))
+    # Écriture directe : le client repart de l'état en base, conflit éventuel réglé
+    draft_write_buffer.discard(document_id)
+    
+    for field, value in fields.items():
         setattr(db_document, field, value)
     
-    db.commit()
-    db.refresh(db_document)
+    await db.commit()
+    await db.refresh(db_document)
+    response.headers["ETag"] = entity_etag("document", db_document.id, db_document.created_at, db_document.updated_at)
     return db_document
 
+def _client_version(request: Request) -> Optional[int]:
+    """Version de contenu annoncée par le client (en-tête X-Document-Version)"""
+    value = request.headers.get("x-document-version")
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="En-tête X-Document-Version invalide"
+        )
+
+def _version_conflict(version: Optional[int] = None) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Le document a été modifié depuis la version de base, rechargez-le",
+        headers={"X-Document-Version": str(version)} if version is not None else None
+    )
+
+@router.patch("/{document_id}/content", response_model=DocumentContentPatchResult)
+async def patch_document_content(
+    document_id: int,
+    patch: DocumentContentPatch,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Applique des modifications incrémentales (insertions / suppressions) au contenu
+
+    Les opérations portent sur la version `base_version` du document : si
+    le contenu a changé depuis (autre onglet, génération IA...), la requête
+    est refusée (409) et le client doit recharger le document.
+    """
+    await draft_write_buffer.flush_document(db, document_id)
+    try:
+        result = await patch_content(db, document_id, current_user.id, patch)
+    except VersionConflict as e:
+        raise _version_conflict(e.version)
+    except DeltaError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document non trouvé"
+        )
+    
+    draft_write_buffer.discard(document_id)
+    response.headers["ETag"] = entity_etag("document", result.id, result.created_at, result.updated_at)
+    return {"id": document_id, "version": result.version, "length": result.length}
+
+@router.get("/{document_id}/draft")
+async def get_draft_status(
+    document_id: int,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    État de la sauvegarde automatique d'un document (écritures en attente, conflit)
+
+    Propre au processus qui a reçu les écritures tamponnées.
+    """
+    return draft_write_buffer.draft_status(document_id, current_user.id)
+
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Supprime un document"""
-    document = db.query(DocumentModel).filter(
+    document = await db.scalar(select(DocumentModel).where(
         DocumentModel.id == document_id,
         DocumentModel.user_id == current_user.id
-    ).first()
+    ))
     
     if not document:
         raise HTTPException(
@@ -127,21 +398,29 @@ async def delete_document(
             detail="Document non trouvé"
         )
     
-    db.delete(document)
-    db.commit()
+    draft_write_buffer.discard(document_id)
+    await db.delete(document)
+    await db.commit()
     return {"message": "Document supprimé avec succès"}
 
 @router.post("/{document_id}/generate")
 async def generate_document_content(
     document_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    background: bool = False,
+    regenerate: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Génère le contenu d'un document avec l'IA"""
-    document = db.query(DocumentModel).filter(
+    """Génère le contenu d'un document avec l'IA
+    
+    `regenerate=true` ignore le cache des réponses IA pour obtenir une nouvelle version.
+    """
+    await draft_write_buffer.flush_document(db, document_id)
+    document = await db.scalar(select(DocumentModel).where(
         DocumentModel.id == document_id,
         DocumentModel.user_id == current_user.id
-    ).first()
+    ))
     
     if not document:
         raise HTTPException(
@@ -155,37 +434,256 @@ async def generate_document_content(
             detail="Aucune donnée de template fournie"
         )
     
+    if background:
+        payload = _generation_payload(document)
+        payload["bypass_cache"] = regenerate
+        job = await job_service.enqueue(db, document, payload=payload)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return GenerationJob.from_orm(job)
+    
     try:
         content = await ai_service.generate_document_content(
             template_content="",  # À adapter selon le template
             template_data=document.template_data,
-            document_type=document.document_type.value
+            document_type=document.document_type.value,
+            bypass_cache=regenerate,
+            user_id=current_user.id
         )
         
         document.content = content
-        db.commit()
-        db.refresh(document)
+        await db.commit()
+        await db.refresh(document)
         
         return {"content": content}
         
+    except LLMUserLimitExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la génération: {str(e)}"
         )
 
+def _sse(event: str, data: dict) -> str:
+    """Formate un événement Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def _stream_into_document(
+    db: AsyncSession,
+    document: DocumentModel,
+    tokens: AsyncIterator[str]
+) -> AsyncIterator[str]:
+    """
+    Relaie les tokens en SSE et sauvegarde le contenu partiel à intervalles réguliers
+
+    Si le flux s'interrompt (erreur amont, client déconnecté), le contenu
+    d'origine est réécrit : un document n'est jamais laissé tronqué.
+    """
+    original = document.content
+    parts = []
+    last_checkpoint = time.monotonic()
+    completed = False
+    
+    async def restore() -> None:
+        # Protégé de l'annulation : la requête a pu être annulée par la déconnexion
+        with anyio.CancelScope(shield=True):
+            await db.rollback()
+            document.content = original
+            await db.commit()
+    
+    try:
+        try:
+            async for token in tokens:
+                parts.append(token)
+                yield _sse("token", {"token": token})
+                
+                if time.monotonic() - last_checkpoint >= settings.AI_STREAM_CHECKPOINT_SECONDS:
+                    document.content = "".join(parts)
+                    await db.commit()
+                    last_checkpoint = time.monotonic()
+        except Exception as e:
+            await restore()
+            completed = True
+            yield _sse("error", {"detail": str(e)})
+            return
+        
+        content = "".join(parts).strip()
+        document.content = content
+        await db.commit()
+        completed = True
+        yield _sse("done", {"length": len(content)})
+    finally:
+        # GeneratorExit / annulation : le client est parti avant la fin
+        if not completed:
+            await restore()
+
+def _sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/{document_id}/generate/stream")
+async def stream_document_content(
+    document_id: int,
+    regenerate: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Génère le contenu d'un document avec l'IA et l'envoie en Server-Sent Events"""
+    await draft_write_buffer.flush_document(db, document_id)
+    document = await db.scalar(select(DocumentModel).where(
+        DocumentModel.id == document_id,
+        DocumentModel.user_id == current_user.id
+    ))
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document non trouvé"
+        )
+    
+    if not document.template_data:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Aucune donnée de template fournie"
+        )
+    
+    tokens = ai_service.stream_document_content(
+        template_content="",  # À adapter selon le template
+        template_data=document.template_data,
+        document_type=document.document_type.value,
+        bypass_cache=regenerate,
+        user_id=current_user.id
+    )
+    return _sse_response(_stream_into_document(db, document, tokens))
+
+@router.post("/{document_id}/improve")
+async def improve_document(
+    document_id: int,
+    improvement_type: str,
+    context: Optional[str] = None,
+    chunked: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Améliore un document avec l'IA
+    
+    Les longs documents sont traités section par section, en parallèle
+    (`chunked` force ou désactive ce mode).
+    """
+    await draft_write_buffer.flush_document(db, document_id)
+    document = await db.scalar(select(DocumentModel).where(
+        DocumentModel.id == document_id,
+        DocumentModel.user_id == current_user.id
+    ))
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document non trouvé"
+        )
+    
+    if not document.content:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le document n'a pas de contenu à améliorer"
+        )
+    
+    try:
+        content = await ai_service.improve_document(
+            content=document.content,
+            improvement_type=improvement_type,
+            context=context,
+            user_id=current_user.id,
+            chunked=chunked
+        )
+        
+        document.content = content
+        await db.commit()
+        
+        return {"content": content}
+        
+    except LLMUserLimitExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de l'amélioration: {str(e)}"
+        )
+
+@router.post("/{document_id}/improve/stream")
+async def stream_improve_document(
+    document_id: int,
+    improvement_type: str,
+    context: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Améliore un document avec l'IA et envoie le résultat en Server-Sent Events"""
+    await draft_write_buffer.flush_document(db, document_id)
+    document = await db.scalar(select(DocumentModel).where(
+        DocumentModel.id == document_id,
+        DocumentModel.user_id == current_user.id
+    ))
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document non trouvé"
+        )
+    
+    if not document.content:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le document n'a pas de contenu à améliorer"
+        )
+    
+    tokens = ai_service.stream_improve_document(
+        content=document.content,
+        improvement_type=improvement_type,
+        context=context,
+        user_id=current_user.id
+    )
+    return _sse_response(_stream_into_document(db, document, tokens))
+
+@router.get("/jobs/{job_id}", response_model=GenerationJob)
+async def get_generation_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Récupère le statut et le résultat d'un job de génération"""
+    job = await job_service.get(db, job_id, current_user.id)
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job non trouvé"
+        )
+    
+    return job
+
 @router.post("/{document_id}/export")
 async def export_document(
     document_id: int,
     format: str = "docx",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Exporte un document en DOCX ou PDF"""
-    document = db.query(DocumentModel).filter(
+    await draft_write_buffer.flush_document(db, document_id)
+    document = await db.scalar(select(DocumentModel).where(
         DocumentModel.id == document_id,
         DocumentModel.user_id == current_user.id
-    ).first()
+    ))
     
     if not document:
         raise HTTPException(
@@ -199,34 +697,224 @@ async def export_document(
             detail="Le document n'a pas de contenu à exporter"
         )
     
+    if format not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Format non supporté. Utilisez 'docx' ou 'pdf'"
+        )
+    
     try:
-        filename = f"document_{document_id}"
+        file_path = await export_engine.export(
+            content=document.content,
+            format=format
+        )
         
-        if format == "docx":
-            file_path = document_service.create_docx(
-                content=document.content,
-                filename=filename
-            )
-        elif format == "pdf":
-            docx_path = document_service.create_docx(
-                content=document.content,
-                filename=filename
-            )
-            file_path = document_service.create_pdf_from_docx(docx_path)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Format non supporté. Utilisez 'docx' ou 'pdf'"
-            )
+        # Artefact partagé et évincible : son chemin n'est pas conservé sur le
+        # document, le fichier se récupère par /download
+        return {
+            "file_path": file_path,
+            "download_url": f"{settings.API_V1_STR}/documents/{document_id}/download?format={format}",
+            "message": f"Document exporté en {format.upper()}"
+        }
         
-        # Mettre à jour le chemin du fichier dans la base
-        document.file_path = file_path
-        db.commit()
+    except ExportQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Trop d'exports en cours, réessayez plus tard",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de l'export: {str(e)}"
+        )
+
+def _iter_file(handle: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """Lit un fichier déjà ouvert par morceaux, puis le ferme"""
+    try:
+        while chunk := handle.read(chunk_size):
+            yield chunk
+    finally:
+        handle.close()
+
+def _iter_chunks(data: bytes, chunk_size: int) -> Iterator[bytes]:
+    """Découpe le contenu rendu en morceaux sans recopier le tout"""
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
+
+@router.get("/{document_id}/download")
+async def download_document(
+    document_id: int,
+    request: Request,
+    format: str = "pdf",
+    persist: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Télécharge un document exporté en DOCX ou PDF (réponse en flux)"""
+    await draft_write_buffer.flush_document(db, document_id)
+    document = await db.scalar(select(DocumentModel).where(
+        DocumentModel.id == document_id,
+        DocumentModel.user_id == current_user.id
+    ))
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document non trouvé"
+        )
+    
+    if not document.content:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le document n'a pas de contenu à exporter"
+        )
+    
+    if format not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Format non supporté. Utilisez 'docx' ou 'pdf'"
+        )
+    
+    # L'ETag est l'empreinte de l'artefact : connue avant tout rendu
+    artifact_key = export_engine.artifacts.key(document.content, format)
+    etag = f'"{artifact_key}"'
+    headers = {
+        "ETag": etag,
+        "Content-Disposition": f'attachment; filename="document_{document_id}.{format}"',
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    if persist is None:
+        persist = settings.EXPORT_PERSIST
+    
+    try:
+        # Artefact déjà présent ou persistance demandée : envoi du fichier par
+        # morceaux, depuis un descripteur ouvert (l'éviction peut supprimer
+        # le chemin pendant l'envoi)
+        if persist or export_engine.artifacts.path_for(artifact_key, format).exists():
+            handle = await export_engine.open_export(content=document.content, format=format)
+            headers["Content-Length"] = str(os.fstat(handle.fileno()).st_size)
+            return StreamingResponse(
+                _iter_file(handle, settings.EXPORT_STREAM_CHUNK_SIZE),
+                media_type=MEDIA_TYPES[format],
+                headers=headers
+            )
         
-        return {"file_path": file_path, "message": f"Document exporté en {format.upper()}"}
+        data = await export_engine.export_bytes(content=document.content, format=format)
+        headers["Content-Length"] = str(len(data))
+        return StreamingResponse(
+            _iter_chunks(data, settings.EXPORT_STREAM_CHUNK_SIZE),
+            media_type=MEDIA_TYPES[format],
+            headers=headers
+        )
         
+    except ExportQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Trop d'exports en cours, réessayez plus tard",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de l'export: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/export/bulk")
+async def bulk_export_documents(
+    export_request: DocumentBulkExport,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Exporte plusieurs documents dans une archive ZIP envoyée en flux"""
+    if export_request.format not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Format non supporté. Utilisez 'docx' ou 'pdf'"
+        )
+    
+    await draft_write_buffer.flush_user(db, current_user.id)
+    
+    # Seuls les identifiants et titres sont chargés ici, le contenu l'est au fil du rendu
+    query = select(DocumentModel.id, DocumentModel.title).where(
+        DocumentModel.user_id == current_user.id
+    )
+    if export_request.ids:
+        query = query.where(DocumentModel.id.in_(export_request.ids))
+    if export_request.document_type:
+        query = query.where(DocumentModel.document_type == export_request.document_type)
+    if export_request.status:
+        query = query.where(DocumentModel.status == export_request.status)
+    if export_request.created_from:
+        query = query.where(DocumentModel.created_at >= export_request.created_from)
+    if export_request.created_to:
+        query = query.where(DocumentModel.created_at <= export_request.created_to)
+    
+    documents = (await db.execute(
+        query.order_by(DocumentModel.id).limit(settings.BULK_EXPORT_MAX_DOCUMENTS + 1)
+    )).all()
+    
+    if not documents:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Aucun document à exporter"
+        )
+    
+    if len(documents) > settings.BULK_EXPORT_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Un export groupé est limité à {settings.BULK_EXPORT_MAX_DOCUMENTS} documents"
+        )
+    
+    # Une session asynchrone n'accepte pas de requêtes concurrentes
+    session_lock = asyncio.Lock()
+    
+    async def load_content(document_id: int) -> Optional[str]:
+        async with session_lock:
+            return await db.scalar(select(DocumentModel.content).where(
+                DocumentModel.id == document_id,
+                DocumentModel.user_id == current_user.id
+            ))
+    
+    return StreamingResponse(
+        stream_zip_archive(
+            export_engine,
+            [(document.id, document.title) for document in documents],
+            load_content,
+            format=export_request.format,
+            concurrency=export_engine.max_workers
+        ),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="documents_{export_request.format}.zip"',
+            "X-Export-Count": str(len(documents)),
+        }
+    )
+
+@router.get("/ai/stats")
+async def get_ai_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Statistiques des appels IA (cache, attente, latence amont)"""
+    return {
+        "cache": ai_service.cache.stats() if ai_service.cache else None,
+        "single_flight": ai_service.single_flight.stats(),
+        "client": ai_service.client.stats()
+    }
+
+@router.get("/export/stats")
+async def get_export_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Statistiques du moteur d'export (file d'attente, latences par format)"""
+    return export_engine.stats()
+
+@router.get("/drafts/stats")
+async def get_draft_write_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Statistiques du tampon de sauvegarde automatique (écritures reçues, fusionnées, écrites)"""
+    return draft_write_buffer.stats()
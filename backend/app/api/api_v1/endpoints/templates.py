@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.responses import FastJSONResponse
 from app.schemas.template import Template, TemplateCreate, TemplateUpdate, TemplateWithUsage
 from app.models.template import Template as TemplateModel
 from app.api.deps import get_current_user
+from app.services.etag import CACHE_CONTROL, check_if_match, entity_etag, is_not_modified
+from app.services.pagination import InvalidCursor, decode_cursor, keyset_page, split_page
+from app.services.public_template_cache import merge_entries, public_template_cache, to_entry
+from app.services.template_cache import template_cache
 from app.models.user import User
 
 router = APIRouter()
@@ -13,33 +19,52 @@ router = APIRouter()
 async def get_templates(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     category: Optional[str] = None,
     public_only: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Récupère la liste des templates"""
-    query = db.query(TemplateModel)
-    
-    if public_only:
-        query = query.filter(TemplateModel.is_public == True)
-    else:
-        # Templates publics + templates de l'utilisateur
-        query = query.filter(
-            (TemplateModel.is_public == True) | 
-            (TemplateModel.user_id == current_user.id)
-        )
+    """
+    Récupère la liste des templates (pagination par curseur, voir X-Next-Cursor)
+
+    Les templates publics viennent du catalogue en cache, déjà sérialisé ;
+    seuls les templates privés de l'utilisateur sont lus en base puis
+    fusionnés par date de création.
+    """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    # Lignes nécessaires pour servir la page et savoir s'il en reste une suivante
+    needed = skip + limit + 1
+    
+    public = await public_template_cache.list(db, category)
+    if position:
+        public = [entry for entry in public if (entry.created_at, entry.id) < position]
+    entries = public[:needed]
     
-    if category:
-        query = query.filter(TemplateModel.category == category)
+    if not public_only:
+        # Templates privés de l'utilisateur (ses templates publics sont déjà au catalogue)
+        query = select(TemplateModel).where(
+            TemplateModel.user_id == current_user.id,
+            TemplateModel.is_public == False
+        )
+        if category:
+            query = query.where(TemplateModel.category == category)
+        query = keyset_page(query, TemplateModel, cursor, needed - 1, db.bind.dialect.name)
+        private = [to_entry(template) for template in (await db.scalars(query)).all()]
+        entries = merge_entries(entries, private)
     
-    templates = query.offset(skip).limit(limit).all()
-    return templates
+    page, next_cursor = split_page(entries[skip:needed], limit)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return FastJSONResponse([entry.payload for entry in page], headers=headers)
 
 @router.post("/", response_model=Template)
 async def create_template(
     template: TemplateCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Crée un nouveau template"""
@@ -49,68 +74,109 @@ async def create_template(
     )
     
     db.add(db_template)
-    db.commit()
-    db.refresh(db_template)
+    await db.commit()
+    await db.refresh(db_template)
+    if db_template.is_public:
+        public_template_cache.invalidate()
     return db_template
 
 @router.get("/{template_id}", response_model=Template)
 async def get_template(
     template_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Récupère un template spécifique"""
-    template = db.query(TemplateModel).filter(
-        TemplateModel.id == template_id,
-        (TemplateModel.is_public == True) | 
-        (TemplateModel.user_id == current_user.id)
-    ).first()
+    """
+    Récupère un template spécifique (304 si If-None-Match correspond)
+
+    L'ETag vient toujours de la base (lecture par clé primaire) et non du
+    catalogue en cache, propre à chaque processus : tous les workers
+    donnent le même ETag pour une même version.
+    """
+    version = (await db.execute(
+        select(TemplateModel.id, TemplateModel.created_at, TemplateModel.updated_at).where(
+            TemplateModel.id == template_id,
+            (TemplateModel.is_public == True) | 
+            (TemplateModel.user_id == current_user.id)
+        )
+    )).first()
     
-    if not template:
+    if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Template non trouvé"
         )
     
+    etag = entity_etag("template", *version)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    public = await public_template_cache.get(db, template_id)
+    if public is not None:
+        if (public.id, public.created_at, public.updated_at) == tuple(version):
+            payload = {key: value for key, value in public.payload.items() if key != "usage_count"}
+            return FastJSONResponse(payload, headers=headers)
+        # Modifié par un autre processus : catalogue local périmé
+        public_template_cache.invalidate()
+    
+    template = await db.scalar(select(TemplateModel).where(TemplateModel.id == template_id))
+    response.headers.update(headers)
     return template
 
 @router.put("/{template_id}", response_model=Template)
 async def update_template(
     template_id: int,
     template_update: TemplateUpdate,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Met à jour un template"""
-    db_template = db.query(TemplateModel).filter(
+    """Met à jour un template (412 si If-Match ne correspond plus)"""
+    query = select(TemplateModel).where(
         TemplateModel.id == template_id,
         TemplateModel.user_id == current_user.id
-    ).first()
+    )
+    if request.headers.get("if-match"):
+        query = query.with_for_update()
+    db_template = await db.scalar(query)
     
     if not db_template:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Template non trouvé"
         )
+    was_public = db_template.is_public
     
-    for field, value in template_update.dict(exclude_unset=True).items():
+    check_if_match(request, entity_etag("template", db_template.id, db_template.created_at, db_template.updated_at))
+    
+    update_data = template_update.dict(exclude_unset=True)
+    for field, value in update_data.items():
         setattr(db_template, field, value)
     
-    db.commit()
-    db.refresh(db_template)
+    await db.commit()
+    await db.refresh(db_template)
+    
+    if was_public or db_template.is_public:
+        public_template_cache.invalidate()
+    
+    response.headers["ETag"] = entity_etag("template", db_template.id, db_template.created_at, db_template.updated_at)
     return db_template
 
 @router.delete("/{template_id}")
 async def delete_template(
     template_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Supprime un template"""
-    template = db.query(TemplateModel).filter(
+    template = await db.scalar(select(TemplateModel).where(
         TemplateModel.id == template_id,
         TemplateModel.user_id == current_user.id
-    ).first()
+    ))
     
     if not template:
         raise HTTPException(
@@ -118,10 +184,23 @@ async def delete_template(
             detail="Template non trouvé"
         )
     
-    db.delete(template)
-    db.commit()
+    was_public = template.is_public
+    await db.delete(template)
+    await db.commit()
+    if was_public:
+        public_template_cache.invalidate()
     return {"message": "Template supprimé avec succès"}
 
+@router.get("/cache/stats")
+async def get_template_cache_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Statistiques des caches de templates (catalogue public, templates compilés)"""
+    return {
+        "public": public_template_cache.stats(),
+        "compiled": template_cache.stats()
+    }
+
 @router.get("/categories/list")
 async def get_template_categories():
     """Récupère la liste des catégories de templates"""
@@ -131,15 +210,15 @@ async def get_template_categories():
 @router.post("/{template_id}/duplicate", response_model=Template)
 async def duplicate_template(
     template_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """Duplique un template"""
-    original_template = db.query(TemplateModel).filter(
+    original_template = await db.scalar(select(TemplateModel).where(
         TemplateModel.id == template_id,
         (TemplateModel.is_public == True) | 
         (TemplateModel.user_id == current_user.id)
-    ).first()
+    ))
     
     if not original_template:
         raise HTTPException(
@@ -154,12 +233,12 @@ async def duplicate_template(
         category=original_template.category,
         template_content=original_template.template_content,
         variables_schema=original_template.variables_schema,
-        is_public=False,  # La copie est privée
+        is_public=False,  # La copie est privée : le catalogue public ne change pas
         is_active=True,
         user_id=current_user.id
     )
     
     db.add(new_template)
-    db.commit()
-    db.refresh(new_template)
+    await db.commit()
+    await db.refresh(new_template)
     return new_template 
\ No newline at end of file
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.responses import rows_response
 from app.schemas.user import User, UserUpdate
 from app.models.user import User as UserModel
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_user_record
+from app.services.user_cache import user_cache
 
 router = APIRouter()
 
@@ -12,7 +15,7 @@ router = APIRouter()
 async def get_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_user)
 ):
     """Récupère la liste des utilisateurs (admin seulement)"""
@@ -22,12 +25,12 @@ async def get_users(
             detail="Accès refusé"
         )
     
-    users = db.query(UserModel).offset(skip).limit(limit).all()
-    return users
+    users = (await db.scalars(select(UserModel).offset(skip).limit(limit))).all()
+    return rows_response(users, User)
 
 @router.get("/profile", response_model=User)
 async def get_user_profile(
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserModel = Depends(get_current_user_record)
 ):
     """Récupère le profil de l'utilisateur connecté"""
     return current_user
@@ -35,13 +38,20 @@ async def get_user_profile(
 @router.put("/profile", response_model=User)
 async def update_user_profile(
     user_update: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user_record)
 ):
     """Met à jour le profil de l'utilisateur connecté"""
     for field, value in user_update.dict(exclude_unset=True).items():
         setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
-    return current_user 
\ No newline at end of file
+    await db.commit()
+    await db.refresh(current_user)
+    return current_user
+
+@router.get("/cache/stats")
+async def get_user_cache_stats(
+    current_user: UserModel = Depends(get_current_user)
+):
+    """Statistiques du cache des utilisateurs authentifiés"""
+    return user_cache.stats() 
\ No newline at end of file
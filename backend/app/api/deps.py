@@ -1,18 +1,17 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User
+from app.services.user_cache import user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    """Récupère l'utilisateur actuel à partir du token JWT"""
+def _token_subject(token: str) -> str:
+    """Extrait l'email (sujet) d'un token JWT valide"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Impossible de valider les identifiants",
@@ -27,12 +26,46 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == email).first()
+    return email
+
+async def _load_user(db: AsyncSession, email: str) -> User:
+    user = await db.scalar(select(User).where(User.email == email))
     if user is None:
-        raise credentials_exception
-    
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Impossible de valider les identifiants",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_cache.set(email, user)
     return user
 
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Récupère l'utilisateur actuel à partir du token JWT
+
+    En cas de succès du cache, l'utilisateur retourné est détaché de la
+    session et ne porte que les champs d'authentification (id, email,
+    is_active, is_superuser) : utiliser get_current_user_record pour lire
+    ou modifier le profil complet.
+    """
+    email = _token_subject(token)
+    
+    cached = user_cache.get(email)
+    if cached is not None:
+        return User(**cached)
+    
+    return await _load_user(db, email)
+
+async def get_current_user_record(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """Récupère l'utilisateur actuel depuis la base, attaché à la session"""
+    return await _load_user(db, _token_subject(token))
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
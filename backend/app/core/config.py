@@ -25,15 +25,59 @@ class Settings(BaseSettings):
 
     # Base de données
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./draftly.db")
+    DB_POOL_SIZE: int = 10  # Connexions gardées ouvertes par processus
+    DB_MAX_OVERFLOW: int = 10  # Connexions supplémentaires en pic de charge
+    DB_POOL_TIMEOUT: float = 30.0  # Attente maximale d'une connexion libre
+    DB_POOL_PRE_PING: bool = True  # Vérifie la connexion avant de la réutiliser
+    DB_POOL_RECYCLE: int = 1800  # Secondes avant de renouveler une connexion
     
     # Sécurité
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_ROUNDS: int = 12  # Coût bcrypt, les anciens hash sont mis à jour à la connexion
+    PASSWORD_HASH_WORKERS: int = 4  # Threads dédiés à bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Calculs en attente avant de répondre 503
+    USER_CACHE_SIZE: int = 1024  # Utilisateurs authentifiés gardés en mémoire
+    USER_CACHE_TTL_SECONDS: float = 30.0  # 0 pour désactiver le cache
     
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = "gpt-3.5-turbo"
+    LLM_PROVIDER: str = "openai"  # "openai" ou "local" (tests de charge, benchmarks)
+    LLM_DEADLINE_SECONDS: float = 90.0  # Échéance d'un appel, réessais compris
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_DELAY: float = 0.5
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    LLM_MAX_CONCURRENCY: int = 16  # Appels amont simultanés par processus
+    LLM_MAX_PER_USER: int = 2  # Générations simultanées par utilisateur
+    LLM_MAX_CONNECTIONS: int = 32
+    
+    # Fournisseur IA local déterministe (LLM_PROVIDER=local)
+    LOCAL_LLM_FIRST_TOKEN_LATENCY: float = 0.5  # Secondes avant le premier token
+    LOCAL_LLM_TOKENS_PER_SECOND: float = 50.0
+    LOCAL_LLM_ERROR_RATE: float = 0.0  # Proportion d'appels en erreur (réessayables)
+    LOCAL_LLM_OUTPUT_TOKENS: int = 400
+    LOCAL_LLM_SEED: int = 0
+    
+    # Cache des réponses IA
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_MEMORY_SIZE: int = 256  # Réponses gardées en mémoire par processus
+    AI_CACHE_PATH: str = "ai_cache.db"  # Niveau SQLite, vide pour le désactiver
+    AI_CACHE_TTL_SECONDS: int = 24 * 3600
+    AI_CACHE_BYPASS_USER_IDS: str = os.getenv("AI_CACHE_BYPASS_USER_IDS", "")  # Ex. "12,42" : toujours une réponse fraîche
+    AI_STREAM_CHECKPOINT_SECONDS: float = 2.0  # Sauvegarde du contenu partiel en streaming
+    
+    # Amélioration des longs documents section par section
+    AI_CHUNK_THRESHOLD_CHARS: int = 6000  # Au-delà, improve_document découpe le document
+    AI_CHUNK_TARGET_CHARS: int = 3000  # Taille visée pour chaque morceau
+    AI_CHUNK_CONCURRENCY: int = 4  # Morceaux améliorés simultanément
+    
+    # Jobs de génération IA (worker.py)
+    GENERATION_WORKER_CONCURRENCY: int = 4  # Générations simultanées par worker
+    GENERATION_WORKER_POLL_INTERVAL: float = 1.0  # Secondes entre deux scrutations de la file
+    GENERATION_JOB_LEASE_MARGIN_SECONDS: float = 30.0  # Bail = échéance IA + réessais + cette marge
+    GENERATION_JOB_MAX_ATTEMPTS: int = 3
     
     # Auth0 (optionnel)
     AUTH0_DOMAIN: str = os.getenv("AUTH0_DOMAIN", "")
@@ -44,8 +88,25 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     
+    # Export DOCX/PDF
+    EXPORT_WORKERS: int = 2  # Processus dédiés au rendu
+    EXPORT_MAX_QUEUE: int = 16  # Exports en attente avant de répondre 429
+    EXPORT_PERSIST: bool = True  # Conserver les téléchargements dans UPLOAD_DIR
+    EXPORT_CACHE_MAX_FILES: int = 1000  # Artefacts conservés avant éviction des plus anciens
+    EXPORT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # Taille maximale du dossier d'artefacts
+    EXPORT_STREAM_CHUNK_SIZE: int = 64 * 1024
+    BULK_EXPORT_MAX_DOCUMENTS: int = 5000
+    
+    # Sauvegarde automatique des brouillons
+    DRAFT_WRITE_BUFFER_ENABLED: bool = True  # Fusionner en mémoire les PUT ?buffered=true
+    DRAFT_WRITE_FLUSH_INTERVAL: float = 2.0  # Secondes entre deux écritures groupées
+    DRAFT_WRITE_MAX_PENDING: int = 1000  # Documents en attente avant une écriture immédiate
+    
     # Templates
     TEMPLATES_DIR: str = "app/templates"
+    TEMPLATE_CACHE_SIZE: int = 128  # Nombre de templates compilés gardés en mémoire
+    PUBLIC_TEMPLATE_CACHE_TTL_SECONDS: float = 60.0  # Catalogue public gardé en mémoire par processus
+    TEMPLATE_BYTECODE_CACHE_DIR: str = os.getenv("TEMPLATE_BYTECODE_CACHE_DIR", "")  # Vide = dossier temporaire
     
     class Config:
         case_sensitive = True
@@ -1,16 +1,58 @@
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .db_metrics import ASYNC_POOL_CLASS, SYNC_POOL_CLASS, async_pool_metrics, sync_pool_metrics
 
-# Création du moteur de base de données
+def get_async_database_url(url: str) -> str:
+    """Convertit l'URL de base de données vers son pilote asynchrone"""
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+def get_pool_options(url: str, pool_class) -> dict:
+    """Réglages du pool de connexions (SQLite garde le pool par défaut)"""
+    if "sqlite" in url:
+        return {}
+    return {
+        "poolclass": pool_class,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+# Création du moteur de base de données (scripts, initialisation)
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
+    **get_pool_options(settings.DATABASE_URL, SYNC_POOL_CLASS)
+)
+
+# Moteur asynchrone utilisé par l'API et le worker
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    **get_pool_options(settings.DATABASE_URL, ASYNC_POOL_CLASS)
 )
 
+sync_pool_metrics.attach(engine.pool)
+async_pool_metrics.attach(async_engine.sync_engine.pool)
+
 # Création de la session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False  # Pas de rechargement implicite (interdit en asynchrone)
+)
 
 # Base pour les modèles
 Base = declarative_base()
@@ -23,6 +65,53 @@ def get_db():
     finally:
         db.close()
 
+# Fonction pour obtenir une session DB asynchrone
+async def get_async_db():
+    start = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as db:
+            yield db
+    finally:
+        # Durée de vie de la session sur la requête (streaming compris)
+        async_pool_metrics.observe_session(time.perf_counter() - start)
+
+# Statistiques des pools de connexions
+def get_pool_stats() -> dict:
+    return {
+        "async": async_pool_metrics.stats(async_engine.sync_engine.pool),
+        "sync": sync_pool_metrics.stats(engine.pool),
+        "settings": {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+        }
+    }
+
 # Fonction pour créer toutes les tables
 def create_tables():
-    Base.metadata.create_all(bind=engine) 
\ No newline at end of file
+    from app.models import Base as ModelsBase
+    from app.services.search_service import install_search_index
+
+    Base.metadata.create_all(bind=engine)
+    ModelsBase.metadata.create_all(bind=engine)
+    # Colonnes ajoutées après coup aux tables existantes
+    added_columns = {
+        "documents": {"version": "INTEGER NOT NULL DEFAULT 1"},
+        "generation_jobs": {"document_version": "INTEGER"},
+    }
+    for table, columns in added_columns.items():
+        existing = {column["name"] for column in inspect(engine).get_columns(table)}
+        for name, ddl in columns.items():
+            if name not in existing:
+                with engine.begin() as connection:
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+    # Valeurs ajoutées après coup aux types enum natifs de PostgreSQL
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("ALTER TYPE generationjobstatus ADD VALUE IF NOT EXISTS 'CONFLICTED'"))
+    # create_all ne crée les index qu'avec leur table : rattrapage des bases existantes
+    for table in ModelsBase.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    with engine.begin() as connection:
+        install_search_index(connection)
@@ -0,0 +1,140 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Bornes des histogrammes, en millisecondes
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class Histogram:
+    """Histogramme de durées à bornes fixes, avec total et maximum"""
+
+    def __init__(self, buckets_ms=BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts: List[int] = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        index = next((i for i, bound in enumerate(self.buckets_ms) if ms <= bound), len(self.buckets_ms))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def stats(self) -> Dict:
+        labels = [f"<={bound}ms" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 2) if self.count else None,
+            "max_ms": round(self.max, 2),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class PoolMetrics:
+    """
+    Métriques d'un pool de connexions : attente à l'emprunt, durée de
+    détention des connexions et des sessions par requête.
+
+    Une attente qui grimpe alors que les détentions restent courtes indique
+    un pool trop petit pour le nombre de requêtes simultanées du worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkout_wait = Histogram()
+        self.connection_hold = Histogram()
+        self.session_hold = Histogram()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.invalidated = 0
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkout_wait.observe(seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def observe_session(self, seconds: float) -> None:
+        with self._lock:
+            self.session_hold.observe(seconds)
+
+    def attach(self, pool: Pool) -> None:
+        """Branche les événements d'emprunt et de restitution du pool"""
+
+        @event.listens_for(pool, "checkout")
+        def on_checkout(dbapi_connection, record, proxy):
+            record.info["checked_out_at"] = time.perf_counter()
+            with self._lock:
+                self.checkouts += 1
+
+        @event.listens_for(pool, "checkin")
+        def on_checkin(dbapi_connection, record):
+            started = record.info.pop("checked_out_at", None)
+            if started is not None:
+                with self._lock:
+                    self.connection_hold.observe(time.perf_counter() - started)
+
+        @event.listens_for(pool, "invalidate")
+        def on_invalidate(dbapi_connection, record, exception):
+            with self._lock:
+                self.invalidated += 1
+
+    def stats(self, pool: Optional[Pool] = None) -> Dict:
+        """
+        Statistiques cumulées, avec l'occupation courante du pool fourni
+        """
+        with self._lock:
+            data = {
+                "pool": type(pool).__name__ if pool is not None else None,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "invalidated": self.invalidated,
+                "checkout_wait": self.checkout_wait.stats(),
+                "connection_hold": self.connection_hold.stats(),
+                "session_hold": self.session_hold.stats(),
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return data
+
+
+class _TimedPoolMixin:
+    """Mesure le temps d'attente d'une connexion libre dans le pool"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            # Pool plein au-delà de pool_timeout
+            timed_out = True
+            raise
+        finally:
+            self.metrics.observe_wait(time.perf_counter() - start, timed_out)
+
+
+def timed_pool_class(base, metrics: PoolMetrics):
+    """Construit une classe de pool (QueuePool ou sa variante asynchrone) instrumentée"""
+    return type(f"Timed{base.__name__}", (_TimedPoolMixin, base), {"metrics": metrics})
+
+
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+SYNC_POOL_CLASS = timed_pool_class(QueuePool, sync_pool_metrics)
+ASYNC_POOL_CLASS = timed_pool_class(AsyncAdaptedQueuePool, async_pool_metrics)
@@ -1,10 +1,18 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Dict, Optional, Tuple, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Un hash dont le coût diffère de PASSWORD_HASH_ROUNDS est marqué à mettre à jour
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS
+)
 
 def create_access_token(
     data: dict, expires_delta: Union[timedelta, None] = None
@@ -25,4 +33,88 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """Hash un mot de passe"""
-    return pwd_context.hash(password) 
\ No newline at end of file
+    return pwd_context.hash(password) 
+
+class PasswordHasherBusy(Exception):
+    """Levée quand trop de calculs de mot de passe sont en attente"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Trop d'authentifications en cours")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Hachage et vérification bcrypt hors de la boucle d'événements.
+
+    bcrypt libère le GIL : un pool de threads borné suffit à ne plus bloquer
+    les autres requêtes du worker pendant une rafale de connexions. Au-delà
+    de `max_pending` calculs en cours ou en attente, les appels sont refusés.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._pending = 0
+        self.hashes = 0
+        self.verifications = 0
+        self.rehashes = 0
+        self.rejected = 0
+        self.total_time = 0.0
+
+    async def _run(self, func, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy(retry_after=1)
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            self.total_time += time.perf_counter() - start
+
+    async def hash(self, password: str) -> str:
+        self.hashes += 1
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Vérifie un mot de passe et retourne (valide, nouveau hash)
+
+        Le nouveau hash n'est fourni que si le hash stocké utilise un coût
+        différent de la configuration : l'appelant l'enregistre, ce qui
+        permet d'ajuster PASSWORD_HASH_ROUNDS sans bloquer les utilisateurs.
+        """
+        if not hashed_password:
+            return False, None
+        self.verifications += 1
+        valid, new_hash = await self._run(pwd_context.verify_and_update, password, hashed_password)
+        if valid and new_hash:
+            self.rehashes += 1
+        return valid, new_hash
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.hashes + self.verifications
+        return {
+            "workers": self.max_workers,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "rounds": settings.PASSWORD_HASH_ROUNDS,
+            "hashes": self.hashes,
+            "verifications": self.verifications,
+            "rehashes": self.rehashes,
+            "rejected": self.rejected,
+            "avg_ms": round(self.total_time / calls * 1000, 1) if calls else None,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+# Instance partagée par les endpoints d'authentification
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
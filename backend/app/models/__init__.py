@@ -2,6 +2,7 @@ from .base import Base, BaseModel
 from .user import User
 from .document import Document, DocumentType, DocumentStatus
 from .template import Template, TemplateCategory
+from .generation_job import GenerationJob, GenerationJobStatus
 
 __all__ = [
     "Base",
@@ -11,5 +12,7 @@ __all__ = [
     "DocumentType",
     "DocumentStatus",
     "Template",
-    "TemplateCategory"
+    "TemplateCategory",
+    "GenerationJob",
+    "GenerationJobStatus"
 ] 
\ No newline at end of file
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
-from datetime import datetime
+from datetime import datetime, timezone
 
 Base = declarative_base()
 
@@ -11,4 +11,6 @@ class BaseModel(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
\ No newline at end of file
+    # Horodaté par l'application, à la microseconde (CURRENT_TIMESTAMP de
+    # SQLite s'arrête à la seconde) : sert aussi de version pour les ETags
+    updated_at = Column(DateTime(timezone=True), onupdate=lambda: datetime.now(timezone.utc)) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, JSON, Enum, Integer
+from sqlalchemy import Column, String, Text, ForeignKey, JSON, Enum, Integer, Index, event, inspect
 from sqlalchemy.orm import relationship
 import enum
 from .base import BaseModel
@@ -19,6 +19,14 @@ class DocumentStatus(str, enum.Enum):
 
 class Document(BaseModel):
     __tablename__ = "documents"
+    __table_args__ = (
+        # Listes paginées par (created_at, id), avec ou sans filtre
+        Index("ix_documents_user_created", "user_id", "created_at", "id"),
+        Index("ix_documents_user_type_created", "user_id", "document_type", "created_at", "id"),
+        Index("ix_documents_user_status_created", "user_id", "status", "created_at", "id"),
+    )
+    # Relit après chaque UPDATE les valeurs calculées en base (version)
+    __mapper_args__ = {"eager_defaults": True}
     
     title = Column(String(255), nullable=False)
     document_type = Column(Enum(DocumentType), nullable=False)
@@ -26,6 +34,7 @@ class Document(BaseModel):
     content = Column(Text, nullable=True)  # Contenu généré
     template_data = Column(JSON, nullable=True)  # Données du template
     file_path = Column(String(500), nullable=True)  # Chemin vers le fichier généré
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Incrémentée à chaque changement de contenu
     
     # Relations
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -34,4 +43,15 @@ class Document(BaseModel):
     template = relationship("Template", back_populates="documents")
     
     def __repr__(self):
-        return f"<Document {self.title}>" 
\ No newline at end of file
+        return f"<Document {self.title}>"
+
+@event.listens_for(Document, "before_update")
+def bump_content_version(mapper, connection, target):
+    """
+    Nouvelle version dès que le contenu change, quel que soit le chemin d'écriture
+
+    Incrément calculé par la base (version = version + 1) et non depuis la
+    copie en mémoire, qui peut dater d'avant une écriture concurrente.
+    """
+    if inspect(target).attrs.content.history.has_changes():
+        target.version = Document.version + 1
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, Text, ForeignKey, JSON, Enum, Integer, DateTime
+from sqlalchemy.orm import relationship
+import enum
+from .base import BaseModel
+
+class GenerationJobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CONFLICTED = "conflicted"  # Document modifié depuis la soumission : résultat non appliqué
+
+class GenerationJob(BaseModel):
+    __tablename__ = "generation_jobs"
+    
+    job_type = Column(String(50), nullable=False, default="generate")
+    status = Column(Enum(GenerationJobStatus), nullable=False, default=GenerationJobStatus.PENDING, index=True)
+    payload = Column(JSON, nullable=True)  # Paramètres figés à la soumission
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(255), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)  # Début du bail du worker
+    document_version = Column(Integer, nullable=True)  # Version du document à la soumission
+    
+    # Relations
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    document = relationship("Document")
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    def __repr__(self):
+        return f"<GenerationJob {self.id} {self.status}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, JSON, Boolean, Enum, Integer
+from sqlalchemy import Column, String, Text, ForeignKey, JSON, Boolean, Enum, Integer, Index
 from sqlalchemy.orm import relationship
 import enum
 from .base import BaseModel
@@ -13,6 +13,11 @@ class TemplateCategory(str, enum.Enum):
 
 class Template(BaseModel):
     __tablename__ = "templates"
+    __table_args__ = (
+        # "is_public OR user_id" : un index par branche, combinés par la base (BitmapOr)
+        Index("ix_templates_public_created", "is_public", "created_at", "id"),
+        Index("ix_templates_user_created", "user_id", "created_at", "id"),
+    )
     
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
@@ -1,6 +1,7 @@
 from .user import User, UserCreate, UserUpdate, UserInDB
-from .document import Document, DocumentCreate, DocumentUpdate, DocumentWithTemplate
+from .document import Document, DocumentCreate, DocumentUpdate, DocumentWithTemplate, DocumentSummary, DocumentSearchResult, DocumentBulkExport, ContentOp, DocumentContentPatch, DocumentContentPatchResult
 from .template import Template, TemplateCreate, TemplateUpdate, TemplateWithUsage
+from .generation_job import GenerationJob
 
 __all__ = [
     "User",
@@ -11,8 +12,15 @@ __all__ = [
     "DocumentCreate",
     "DocumentUpdate", 
     "DocumentWithTemplate",
+    "DocumentSummary",
+    "DocumentSearchResult",
+    "DocumentBulkExport",
+    "ContentOp",
+    "DocumentContentPatch",
+    "DocumentContentPatchResult",
     "Template",
     "TemplateCreate",
     "TemplateUpdate",
-    "TemplateWithUsage"
+    "TemplateWithUsage",
+    "GenerationJob"
 ] 
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime
 from app.models.document import DocumentType, DocumentStatus
 
@@ -18,6 +18,14 @@ class DocumentUpdate(BaseModel):
     content: Optional[str] = None
     template_data: Optional[Dict[str, Any]] = None
 
+class DocumentBulkExport(BaseModel):
+    ids: Optional[List[int]] = None
+    document_type: Optional[DocumentType] = None
+    status: Optional[DocumentStatus] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    format: str = "pdf"
+
 class DocumentInDBBase(DocumentBase):
     id: int
     content: Optional[str] = None
@@ -25,6 +33,7 @@ class DocumentInDBBase(DocumentBase):
     file_path: Optional[str] = None
     user_id: int
     template_id: Optional[int] = None
+    version: int = 1
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -35,4 +44,45 @@ class Document(DocumentInDBBase):
     pass
 
 class DocumentWithTemplate(Document):
-    template_name: Optional[str] = None 
\ No newline at end of file
+    template_name: Optional[str] = None 
+
+class DocumentSummary(BaseModel):
+    """Projection de liste (GET /documents?view=summary)"""
+    id: int
+    title: str
+    document_type: DocumentType
+    status: Optional[DocumentStatus] = None
+    template_id: Optional[int] = None
+    template_name: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class DocumentSearchResult(BaseModel):
+    """Résultat de GET /documents/search, du plus pertinent au moins pertinent"""
+    id: int
+    title: str
+    document_type: DocumentType
+    status: Optional[DocumentStatus] = None
+    template_id: Optional[int] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    rank: float
+    snippet: Optional[str] = None  # HTML échappé, termes trouvés entre <mark>
+
+
+class ContentOp(BaseModel):
+    """Insertion ou suppression, positions en unités UTF-16"""
+    op: Literal["insert", "delete"]
+    pos: int = Field(ge=0)
+    text: Optional[str] = None  # insert
+    length: int = Field(default=0, ge=0)  # delete
+
+class DocumentContentPatch(BaseModel):
+    base_version: int
+    ops: List[ContentOp] = Field(max_length=1000)
+
+class DocumentContentPatchResult(BaseModel):
+    id: int
+    version: int
+    length: int
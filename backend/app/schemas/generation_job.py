@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from app.models.generation_job import GenerationJobStatus
+
+class GenerationJob(BaseModel):
+    id: int
+    job_type: str
+    status: GenerationJobStatus
+    document_id: int
+    result: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
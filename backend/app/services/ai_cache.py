@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalise un prompt pour que l'indentation et les espaces n'influent pas sur la clé
+    """
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def cache_key(model: str, system: str, prompt: str, temperature: float, max_tokens: int) -> str:
+    raw = json.dumps(
+        [model, system, normalize_prompt(prompt), temperature, max_tokens],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AICacheBackend:
+    """Interface d'un niveau de cache des réponses IA"""
+
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(AICacheBackend):
+    """Niveau mémoire : LRU borné, propre au processus"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        self._entries[key] = (value, time.time() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class SQLiteCacheBackend(AICacheBackend):
+    """Niveau disque : base SQLite partagée par les processus d'une même machine"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM ai_cache WHERE key = ? AND expires_at >= ?",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl)
+            )
+            self._conn.execute("DELETE FROM ai_cache WHERE expires_at < ?", (now,))
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+
+class AIResponseCache:
+    """
+    Cache à plusieurs niveaux des réponses IA.
+
+    Les niveaux sont consultés dans l'ordre ; une réponse trouvée dans un
+    niveau lent est recopiée dans les niveaux plus rapides.
+    """
+
+    def __init__(self, backends: List[AICacheBackend], ttl: int):
+        self.backends = backends
+        self.ttl = ttl
+        self.hits: Dict[str, int] = {type(backend).__name__: 0 for backend in backends}
+        self.misses = 0
+        self.bypassed = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        for index, backend in enumerate(self.backends):
+            value = await backend.get(key)
+            if value is not None:
+                self.hits[type(backend).__name__] += 1
+                for faster in self.backends[:index]:
+                    await faster.set(key, value, self.ttl)
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        for backend in self.backends:
+            await backend.set(key, value, self.ttl)
+
+    def stats(self) -> Dict[str, object]:
+        total_hits = sum(self.hits.values())
+        lookups = total_hits + self.misses
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(total_hits / lookups, 3) if lookups else None,
+        }
+
+
+def build_ai_cache() -> Optional[AIResponseCache]:
+    """
+    Construit le cache configuré, ou None s'il est désactivé
+    """
+    if not settings.AI_CACHE_ENABLED:
+        return None
+
+    backends: List[AICacheBackend] = [MemoryCacheBackend(settings.AI_CACHE_MEMORY_SIZE)]
+    if settings.AI_CACHE_PATH:
+        backends.append(SQLiteCacheBackend(settings.AI_CACHE_PATH))
+    return AIResponseCache(backends, ttl=settings.AI_CACHE_TTL_SECONDS)
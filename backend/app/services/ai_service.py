@@ -1,26 +1,172 @@
-import openai
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional
 from app.core.config import settings
+from app.services.ai_cache import AIResponseCache, build_ai_cache, cache_key
+from app.services.llm_client import LLMClient, LLMUserLimitExceeded, llm_client
+from app.services.single_flight import SingleFlight
+import asyncio
 import json
+import re
+
+# Les contrats et CGV sont structurés en "## Article N - ..."
+SECTION_HEADING = re.compile(r"^##\s", re.MULTILINE)
+
+
+def parse_user_ids(value: str) -> frozenset:
+    """Liste d'identifiants séparés par des virgules ("12,42")"""
+    return frozenset(int(part) for part in value.split(",") if part.strip())
+
+
+def is_json(response: str) -> bool:
+    try:
+        json.loads(response)
+    except ValueError:
+        return False
+    return True
+
+def split_sections(content: str, target_chars: int) -> List[str]:
+    """
+    Découpe un document aux titres de section, en regroupant les sections
+    courtes pour que chaque morceau approche `target_chars` caractères
+    """
+    starts = [match.start() for match in SECTION_HEADING.finditer(content)]
+    bounds = [0] + [start for start in starts if start > 0] + [len(content)]
+    sections = [content[a:b].strip() for a, b in zip(bounds, bounds[1:])]
+    
+    chunks: List[str] = []
+    for section in filter(None, sections):
+        if chunks and len(chunks[-1]) + len(section) <= target_chars:
+            chunks[-1] = f"{chunks[-1]}\n\n{section}"
+        else:
+            chunks.append(section)
+    return chunks
+
+def document_outline(content: str, max_chars: int = 600) -> str:
+    """
+    Résumé court du document (titre et intitulés de section) partagé entre les morceaux
+    """
+    lines = [line.strip() for line in content.splitlines() if line.lstrip().startswith("#")]
+    return "\n".join(lines)[:max_chars]
 
 class AIService:
-    def __init__(self):
-        openai.api_key = settings.OPENAI_API_KEY
+    def __init__(
+        self,
+        cache: Optional[AIResponseCache] = None,
+        client: Optional[LLMClient] = None
+    ):
         self.model = settings.OPENAI_MODEL
+        self.cache = cache if cache is not None else build_ai_cache()
+        self.client = client or llm_client
+        # Appels identiques simultanés (double clic, onglets multiples) : un seul appel amont
+        self.single_flight = SingleFlight()
+        # Utilisateurs servis sans cache (tests de prompts, comptes de démonstration...)
+        self.cache_bypass_users = parse_user_ids(settings.AI_CACHE_BYPASS_USER_IDS)
     
-    async def generate_document_content(
-        self, 
-        template_content: str, 
-        template_data: Dict[str, Any],
-        document_type: str,
-        additional_context: Optional[str] = None
+    def _bypasses_cache(self, bypass_cache: bool, user_id: Optional[int]) -> bool:
+        return bypass_cache or user_id in self.cache_bypass_users
+    
+    async def _complete(
+        self,
+        system: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        bypass_cache: bool = False,
+        user_id: Optional[int] = None,
+        cacheable: Optional[Callable[[str], bool]] = None
     ) -> str:
         """
-        Génère le contenu d'un document en utilisant l'IA
+        Appelle le modèle, en servant depuis le cache les requêtes identiques
+
+        `cacheable` filtre les réponses mises en cache (et servies depuis le
+        cache) : une réponse inexploitable n'est pas rejouée pendant tout
+        le TTL.
         """
+        key = cache_key(self.model, system, prompt, temperature, max_tokens)
         
-        # Construction du prompt
-        prompt = f"""
+        if self.cache is not None:
+            if self._bypasses_cache(bypass_cache, user_id):
+                self.cache.bypassed += 1
+            else:
+                cached = await self.cache.get(key)
+                if cached is not None and (cacheable is None or cacheable(cached)):
+                    return cached
+        
+        async def call_upstream() -> str:
+            response = await self.client.chat(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            content = response.strip()
+            
+            if self.cache is not None and (cacheable is None or cacheable(content)):
+                await self.cache.set(key, content)
+            
+            return content
+        
+        # Plafond pris par chaque appelant : l'appel partagé ne dépend pas de l'utilisateur du premier
+        async with self.client.user_slot(user_id):
+            return await self.single_flight.do(key, call_upstream)
+    
+    async def _stream(
+        self,
+        system: str,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        bypass_cache: bool = False,
+        user_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Appelle le modèle en streaming et produit les tokens au fil de l'eau
+        
+        Une réponse en cache est renvoyée d'un seul bloc.
+        """
+        key = cache_key(self.model, system, prompt, temperature, max_tokens)
+        
+        if self.cache is not None:
+            if self._bypasses_cache(bypass_cache, user_id):
+                self.cache.bypassed += 1
+            else:
+                cached = await self.cache.get(key)
+                if cached is not None:
+                    yield cached
+                    return
+        
+        parts = []
+        async for token in self.client.stream_chat(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            user_id=user_id
+        ):
+            # Même résultat que la version non streamée : sans espaces initiaux
+            if not parts:
+                token = token.lstrip()
+                if not token:
+                    continue
+            parts.append(token)
+            yield token
+        
+        if self.cache is not None:
+            await self.cache.set(key, "".join(parts).strip())
+    
+    def _generation_prompt(
+        self,
+        template_content: str,
+        template_data: Dict[str, Any],
+        document_type: str,
+        additional_context: Optional[str] = None
+    ) -> str:
+        return f"""
         Tu es un assistant spécialisé dans la génération de documents professionnels.
         
         Type de document: {document_type}
@@ -42,33 +188,13 @@ class AIService:
         
         Contenu du document:
         """
-        
-        try:
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Tu es un expert en rédaction de documents professionnels."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.3
-            )
-            
-            return response.choices[0].message.content.strip()
-            
-        except Exception as e:
-            raise Exception(f"Erreur lors de la génération IA: {str(e)}")
     
-    async def improve_document(
-        self, 
-        content: str, 
+    def _improvement_prompt(
+        self,
+        content: str,
         improvement_type: str,
         context: Optional[str] = None
     ) -> str:
-        """
-        Améliore un document existant
-        """
-        
         improvement_prompts = {
             "grammar": "Corrige la grammaire et l'orthographe",
             "style": "Améliore le style et la fluidité",
@@ -77,7 +203,7 @@ class AIService:
             "detailed": "Ajoute plus de détails"
         }
         
-        prompt = f"""
+        return f"""
         Document à améliorer:
         {content}
         
@@ -90,24 +216,200 @@ class AIService:
         2. Conserve le sens et la structure
         3. Retourne le document amélioré
         """
+    
+    async def generate_document_content(
+        self, 
+        template_content: str, 
+        template_data: Dict[str, Any],
+        document_type: str,
+        additional_context: Optional[str] = None,
+        bypass_cache: bool = False,
+        user_id: Optional[int] = None
+    ) -> str:
+        """
+        Génère le contenu d'un document en utilisant l'IA
+        """
+        
+        # Construction du prompt
+        prompt = self._generation_prompt(
+            template_content, template_data, document_type, additional_context
+        )
         
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Tu es un expert en amélioration de documents."},
-                    {"role": "user", "content": prompt}
-                ],
+            return await self._complete(
+                system="Tu es un expert en rédaction de documents professionnels.",
+                prompt=prompt,
                 max_tokens=2000,
-                temperature=0.2
+                temperature=0.3,
+                bypass_cache=bypass_cache,
+                user_id=user_id
             )
             
-            return response.choices[0].message.content.strip()
+        except LLMUserLimitExceeded:
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur lors de la génération IA: {str(e)}")
+    
+    async def improve_document(
+        self, 
+        content: str, 
+        improvement_type: str,
+        context: Optional[str] = None,
+        bypass_cache: bool = False,
+        user_id: Optional[int] = None,
+        chunked: Optional[bool] = None
+    ) -> str:
+        """
+        Améliore un document existant
+        
+        Les documents longs (ou `chunked=True`) sont traités section par section.
+        """
+        
+        if chunked is None:
+            chunked = len(content) > settings.AI_CHUNK_THRESHOLD_CHARS
+        if chunked:
+            return await self._improve_chunked(
+                content, improvement_type, context, bypass_cache, user_id
+            )
+        
+        prompt = self._improvement_prompt(content, improvement_type, context)
+        
+        try:
+            return await self._complete(
+                system="Tu es un expert en amélioration de documents.",
+                prompt=prompt,
+                max_tokens=2000,
+                temperature=0.2,
+                bypass_cache=bypass_cache,
+                user_id=user_id
+            )
+            
+        except LLMUserLimitExceeded:
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur lors de l'amélioration: {str(e)}")
+    
+    async def _improve_chunked(
+        self,
+        content: str,
+        improvement_type: str,
+        context: Optional[str],
+        bypass_cache: bool,
+        user_id: Optional[int]
+    ) -> str:
+        """
+        Améliore les sections d'un long document en parallèle puis les réassemble dans l'ordre
+        
+        La durée suit la section la plus longue plutôt que le document entier.
+        """
+        # Les morceaux sont appelés sans utilisateur : contournement décidé ici
+        bypass_cache = self._bypasses_cache(bypass_cache, user_id)
+        chunks = split_sections(content, settings.AI_CHUNK_TARGET_CHARS)
+        if len(chunks) <= 1:
+            return await self.improve_document(
+                content, improvement_type, context, bypass_cache, user_id, chunked=False
+            )
+        
+        outline = document_outline(content)
+        semaphore = asyncio.Semaphore(settings.AI_CHUNK_CONCURRENCY)
+        
+        async def improve_chunk(index: int, chunk: str) -> str:
+            chunk_context = (
+                f"Extrait {index + 1}/{len(chunks)} d'un document plus long. "
+                f"Ne traite que cet extrait, sans ajouter d'introduction ni de conclusion.\n"
+                f"Plan du document:\n{outline}"
+            )
+            if context:
+                chunk_context = f"{context}\n{chunk_context}"
+            async with semaphore:
+                return await self._complete(
+                    system="Tu es un expert en amélioration de documents.",
+                    prompt=self._improvement_prompt(chunk, improvement_type, chunk_context),
+                    max_tokens=2000,
+                    temperature=0.2,
+                    bypass_cache=bypass_cache
+                )
+        
+        try:
+            # Une seule génération décomptée pour l'utilisateur, quel que soit le découpage
+            async with self.client.user_slot(user_id):
+                improved = await asyncio.gather(
+                    *(improve_chunk(index, chunk) for index, chunk in enumerate(chunks))
+                )
+            return "\n\n".join(improved)
             
+        except LLMUserLimitExceeded:
+            raise
         except Exception as e:
             raise Exception(f"Erreur lors de l'amélioration: {str(e)}")
     
-    async def suggest_improvements(self, content: str) -> Dict[str, str]:
+    async def stream_document_content(
+        self,
+        template_content: str,
+        template_data: Dict[str, Any],
+        document_type: str,
+        additional_context: Optional[str] = None,
+        bypass_cache: bool = False,
+        user_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Génère le contenu d'un document en streaming, token par token
+        """
+        prompt = self._generation_prompt(
+            template_content, template_data, document_type, additional_context
+        )
+        
+        try:
+            async for token in self._stream(
+                system="Tu es un expert en rédaction de documents professionnels.",
+                prompt=prompt,
+                max_tokens=2000,
+                temperature=0.3,
+                bypass_cache=bypass_cache,
+                user_id=user_id
+            ):
+                yield token
+                
+        except LLMUserLimitExceeded:
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur lors de la génération IA: {str(e)}")
+    
+    async def stream_improve_document(
+        self,
+        content: str,
+        improvement_type: str,
+        context: Optional[str] = None,
+        bypass_cache: bool = False,
+        user_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Améliore un document existant en streaming, token par token
+        """
+        prompt = self._improvement_prompt(content, improvement_type, context)
+        
+        try:
+            async for token in self._stream(
+                system="Tu es un expert en amélioration de documents.",
+                prompt=prompt,
+                max_tokens=2000,
+                temperature=0.2,
+                bypass_cache=bypass_cache,
+                user_id=user_id
+            ):
+                yield token
+                
+        except LLMUserLimitExceeded:
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur lors de l'amélioration: {str(e)}")
+    
+    async def suggest_improvements(
+        self,
+        content: str,
+        bypass_cache: bool = False,
+        user_id: Optional[int] = None
+    ) -> Dict[str, str]:
         """
         Suggère des améliorations pour un document
         """
@@ -125,17 +427,17 @@ class AIService:
         """
         
         try:
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "Tu es un expert en analyse de documents."},
-                    {"role": "user", "content": prompt}
-                ],
+            response = await self._complete(
+                system="Tu es un expert en analyse de documents.",
+                prompt=prompt,
                 max_tokens=1000,
-                temperature=0.3
+                temperature=0.3,
+                bypass_cache=bypass_cache,
+                user_id=user_id,
+                cacheable=is_json
             )
             
-            suggestions = json.loads(response.choices[0].message.content.strip())
+            suggestions = json.loads(response)
             return suggestions
             
         except Exception as e:
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import re
+import time
+import zipfile
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.export_service import ExportEngine, ExportQueueFull
+
+
+class _ZipStream:
+    """
+    Tampon d'écriture non positionnable pour zipfile, vidé après chaque entrée.
+
+    Sans `seek`, zipfile écrit des descripteurs de données après chaque
+    entrée : l'archive peut donc être envoyée au fil de l'eau.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def archive_name(document_id: int, title: str, format: str) -> str:
+    slug = re.sub(r"[^\w\-]+", "_", title, flags=re.UNICODE).strip("_")[:80]
+    return f"{document_id}_{slug or 'document'}.{format}"
+
+
+async def stream_zip_archive(
+    engine: ExportEngine,
+    documents: List[Tuple[int, str]],
+    load_content: Callable[[int], Awaitable[Optional[str]]],
+    format: str,
+    concurrency: int
+) -> AsyncIterator[bytes]:
+    """
+    Rend les documents en parallèle et produit l'archive ZIP morceau par morceau
+
+    Au plus `concurrency` rendus sont en cours : la mémoire utilisée ne
+    dépend pas du nombre de documents. Les entrées sont ajoutées dans
+    l'ordre où les rendus se terminent, suivies d'un résumé de l'export
+    (`export_summary.json`) avec le débit obtenu.
+    """
+    start = time.perf_counter()
+    stream = _ZipStream()
+    archive = zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_STORED)
+    remaining = iter(documents)
+    pending = set()
+    exported = 0
+    skipped: List[int] = []
+    failed: Dict[int, str] = {}
+
+    async def render(document_id: int, title: str):
+        content = await load_content(document_id)
+        if not content:
+            return document_id, title, None
+        while True:
+            try:
+                return document_id, title, await engine.export_bytes(content, format)
+            except ExportQueueFull as e:
+                await asyncio.sleep(e.retry_after)
+
+    def schedule() -> None:
+        while len(pending) < concurrency:
+            item = next(remaining, None)
+            if item is None:
+                return
+            task = asyncio.ensure_future(render(*item))
+            task.document_id = item[0]
+            pending.add(task)
+
+    try:
+        schedule()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                try:
+                    document_id, title, data = task.result()
+                except Exception as e:
+                    failed[task.document_id] = str(e)
+                    continue
+                if data is None:
+                    skipped.append(document_id)
+                    continue
+                # DOCX et PDF sont déjà compressés : stockage sans recompression
+                archive.writestr(archive_name(document_id, title, format), data)
+                exported += 1
+            schedule()
+            chunk = stream.drain()
+            if chunk:
+                yield chunk
+
+        duration = time.perf_counter() - start
+        summary = {
+            "documents": len(documents),
+            "exported": exported,
+            "skipped": skipped,
+            "failed": failed,
+            "duration_s": round(duration, 3),
+            "documents_per_second": round(exported / duration, 2) if duration else None,
+        }
+        archive.writestr("export_summary.json", json.dumps(summary, ensure_ascii=False, indent=2))
+        archive.close()
+        yield stream.drain()
+    finally:
+        # Client déconnecté : abandon des rendus encore en cours
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document
+from app.schemas.document import ContentOp, DocumentContentPatch
+
+# Positions exprimées en unités UTF-16, comme les index de chaînes JavaScript
+_ENCODING = "utf-16-le"
+_UNIT = 2
+
+
+class DeltaError(ValueError):
+    """Levée quand une opération ne s'applique pas au contenu de base"""
+
+
+class VersionConflict(Exception):
+    """Levée quand le contenu a changé depuis la version de base du client"""
+
+    def __init__(self, version: Optional[int] = None):
+        super().__init__("Le document a été modifié depuis la version de base")
+        self.version = version
+
+
+class PatchResult(NamedTuple):
+    """Document patché : clés de l'ETag, nouvelle version et longueur (unités UTF-16)"""
+    id: int
+    created_at: datetime
+    updated_at: Optional[datetime]
+    version: int
+    length: int
+
+
+def apply_ops(content: str, ops: Iterable[ContentOp]) -> str:
+    """
+    Applique une suite d'insertions / suppressions au contenu
+
+    Chaque opération s'applique au résultat de la précédente. Les positions
+    et longueurs sont comptées en unités UTF-16 (String.length côté
+    navigateur), pour que l'éditeur puisse envoyer ses index sans conversion.
+    """
+    buffer = bytearray(content.encode(_ENCODING))
+    for index, op in enumerate(ops):
+        start = op.pos * _UNIT
+        if op.op == "insert":
+            if start > len(buffer):
+                raise DeltaError(f"Opération {index} : position {op.pos} hors du document")
+            buffer[start:start] = (op.text or "").encode(_ENCODING)
+        else:
+            end = start + op.length * _UNIT
+            if end > len(buffer):
+                raise DeltaError(f"Opération {index} : suppression hors du document")
+            del buffer[start:end]
+    try:
+        return buffer.decode(_ENCODING)
+    except UnicodeDecodeError as e:
+        # Position au milieu d'une paire de substitution (emoji, etc.)
+        raise DeltaError("Une opération coupe un caractère en deux") from e
+
+
+async def patch_content(
+    db: AsyncSession,
+    document_id: int,
+    user_id: int,
+    patch: DocumentContentPatch
+) -> Optional[PatchResult]:
+    """
+    Applique un patch au contenu d'un document (None si le document n'existe pas)
+
+    Lève VersionConflict si `base_version` n'est plus la version en base,
+    y compris quand une écriture concurrente passe entre la lecture et
+    l'écriture, et DeltaError si les opérations ne s'appliquent pas.
+    """
+    current = (await db.execute(
+        select(Document.content, Document.version).where(
+            Document.id == document_id,
+            Document.user_id == user_id
+        )
+    )).first()
+    
+    if not current:
+        return None
+    
+    if current.version != patch.base_version:
+        raise VersionConflict(current.version)
+    
+    content = apply_ops(current.content or "", patch.ops)
+    
+    # Écriture conditionnelle : une autre écriture entre la lecture et ici
+    # fait échouer la condition sur la version au lieu d'être écrasée
+    version = patch.base_version + 1
+    written = (await db.execute(
+        update(Document)
+        .where(Document.id == document_id, Document.version == patch.base_version)
+        .values(content=content, version=version)
+        .returning(Document.id, Document.created_at, Document.updated_at)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if not written:
+        await db.rollback()
+        raise VersionConflict()
+    await db.commit()
+    
+    return PatchResult(*written, version=version, length=len(content.encode(_ENCODING)) // _UNIT)
@@ -0,0 +1,70 @@
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+from app.models.document import Document
+from app.models.template import Template
+
+# Colonnes affichées par les listes : ni `content` ni `template_data`
+SUMMARY_COLUMNS = (
+    Document.id,
+    Document.title,
+    Document.document_type,
+    Document.status,
+    Document.template_id,
+    Document.created_at,
+    Document.updated_at,
+)
+
+
+def summary_query(user_id: int) -> Select:
+    """
+    Projection légère des documents d'un utilisateur, avec le nom du
+    template récupéré par jointure (une seule requête pour toute la page)
+    """
+    return (
+        select(*SUMMARY_COLUMNS, Template.name.label("template_name"))
+        .outerjoin(Template, Document.template_id == Template.id)
+        .where(Document.user_id == user_id)
+    )
+
+
+def full_query(user_id: int) -> Select:
+    """Documents complets, avec le nom du template par jointure"""
+    return (
+        select(Document, Template.name.label("template_name"))
+        .outerjoin(Template, Document.template_id == Template.id)
+        .where(Document.user_id == user_id)
+    )
+
+
+def attach_template_names(rows: Sequence) -> List[Document]:
+    """
+    Reporte le nom du template joint sur chaque document (DocumentWithTemplate)
+    """
+    documents = []
+    for document, template_name in rows:
+        document.template_name = template_name
+        documents.append(document)
+    return documents
+
+
+def serialize_summaries(rows: Sequence) -> List[Dict[str, Any]]:
+    """
+    Sérialise directement les tuples de la projection, sans objet ORM ni
+    validation Pydantic (format de DocumentSummary)
+    """
+    return [
+        {
+            "id": row.id,
+            "title": row.title,
+            "document_type": row.document_type.value,
+            "status": row.status.value if row.status else None,
+            "template_id": row.template_id,
+            "template_name": row.template_name,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+        }
+        for row in rows
+    ]
@@ -1,4 +1,4 @@
-from jinja2 import Template, Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 from docx import Document as DocxDocument
 from docx.shared import Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
@@ -6,11 +6,48 @@ import os
 from typing import Dict, Any, Optional
 from pathlib import Path
 import tempfile
+from io import BytesIO
+from functools import lru_cache
+import html
 from app.core.config import settings
+from app.services.template_cache import template_cache
+
+# Feuille de style commune à tous les exports PDF
+PDF_STYLESHEET = """
+@page { size: A4; margin: 2cm; }
+body { font-family: "DejaVu Sans", Arial, sans-serif; font-size: 11pt; line-height: 1.45; color: #1f2937; }
+h1 { font-size: 20pt; margin: 0 0 12pt; }
+h2 { font-size: 14pt; margin: 16pt 0 6pt; }
+h3 { font-size: 12pt; margin: 12pt 0 4pt; }
+p { margin: 0 0 8pt; text-align: justify; }
+ul { margin: 0 0 8pt; padding-left: 16pt; }
+hr { border: 0; border-top: 1px solid #d1d5db; margin: 12pt 0; }
+"""
+
+def reject_url_fetcher(url: str, *args, **kwargs):
+    """
+    Refuse toute ressource externe au rendu PDF (fichiers locaux, réseau interne...)
+
+    Le contenu des documents vient de l'utilisateur ou de l'IA : WeasyPrint
+    ne doit rien charger d'autre que le HTML et la feuille de style fournis.
+    """
+    raise ValueError(f"Ressource externe refusée: {url[:100]}")
+
+@lru_cache(maxsize=1)
+def get_pdf_stylesheet():
+    """
+    Retourne la feuille de style WeasyPrint, parsée une seule fois par processus
+    """
+    from weasyprint import CSS
+    return CSS(string=PDF_STYLESHEET)
 
 class DocumentService:
     def __init__(self):
-        self.env = Environment(loader=FileSystemLoader(settings.TEMPLATES_DIR))
+        self.env = Environment(
+            loader=FileSystemLoader(settings.TEMPLATES_DIR),
+            bytecode_cache=FileSystemBytecodeCache(settings.TEMPLATE_BYTECODE_CACHE_DIR or None)
+        )
+        self.template_cache = template_cache
         self.upload_dir = Path(settings.UPLOAD_DIR)
         self.upload_dir.mkdir(exist_ok=True)
     
@@ -21,13 +58,30 @@ class DocumentService:
     ) -> str:
         """
         Génère le contenu d'un document à partir d'un template Jinja2
+
+        Le template compilé est mis en cache par empreinte de contenu.
         """
         try:
-            template = Template(template_content)
+            template = self.template_cache.get(template_content)
             return template.render(**template_data)
         except Exception as e:
             raise Exception(f"Erreur lors de la génération du template: {str(e)}")
     
+    def build_docx(self, content: str) -> DocxDocument:
+        """
+        Construit le document DOCX en mémoire à partir du contenu
+        """
+        doc = DocxDocument()
+        
+        # Ajout du contenu
+        paragraphs = content.split('\n\n')
+        for paragraph in paragraphs:
+            if paragraph.strip():
+                p = doc.add_paragraph(paragraph.strip())
+                p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+        
+        return doc
+    
     def create_docx(
         self, 
         content: str, 
@@ -38,14 +92,7 @@ class DocumentService:
         Crée un fichier DOCX à partir du contenu
         """
         try:
-            doc = DocxDocument()
-            
-            # Ajout du contenu
-            paragraphs = content.split('\n\n')
-            for paragraph in paragraphs:
-                if paragraph.strip():
-                    p = doc.add_paragraph(paragraph.strip())
-                    p.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+            doc = self.build_docx(content)
             
             # Sauvegarde du fichier
             file_path = self.upload_dir / f"{filename}.docx"
@@ -56,6 +103,65 @@ class DocumentService:
         except Exception as e:
             raise Exception(f"Erreur lors de la création du fichier DOCX: {str(e)}")
     
+    def render_docx_bytes(self, content: str) -> bytes:
+        """
+        Rend le document DOCX en mémoire, sans écriture disque
+        """
+        try:
+            buffer = BytesIO()
+            self.build_docx(content).save(buffer)
+            return buffer.getvalue()
+            
+        except Exception as e:
+            raise Exception(f"Erreur lors de la création du fichier DOCX: {str(e)}")
+    
+    def render_html(self, content: str) -> str:
+        """
+        Convertit le contenu Markdown d'un document en HTML
+
+        Le HTML brut du contenu est échappé avant la conversion : il est
+        rendu comme du texte, jamais interprété.
+        """
+        import markdown
+        
+        source = html.escape(content.strip(), quote=False).replace("&gt;", ">")
+        body = markdown.markdown(source, extensions=["nl2br", "sane_lists"])
+        return f'<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>{body}</body></html>'
+    
+    def create_pdf(self, content: str, filename: str) -> str:
+        """
+        Crée un fichier PDF directement à partir du contenu Markdown
+        
+        Évite l'aller-retour par DOCX : une seule conversion, une seule écriture disque.
+        """
+        try:
+            from weasyprint import HTML
+            
+            pdf_path = self.upload_dir / f"{filename}.pdf"
+            HTML(string=self.render_html(content), url_fetcher=reject_url_fetcher).write_pdf(
+                str(pdf_path),
+                stylesheets=[get_pdf_stylesheet()]
+            )
+            
+            return str(pdf_path)
+            
+        except Exception as e:
+            raise Exception(f"Erreur lors de la création du fichier PDF: {str(e)}")
+    
+    def render_pdf_bytes(self, content: str) -> bytes:
+        """
+        Rend le document PDF en mémoire, sans écriture disque
+        """
+        try:
+            from weasyprint import HTML
+            
+            return HTML(string=self.render_html(content), url_fetcher=reject_url_fetcher).write_pdf(
+                stylesheets=[get_pdf_stylesheet()]
+            )
+            
+        except Exception as e:
+            raise Exception(f"Erreur lors de la création du fichier PDF: {str(e)}")
+    
     def create_pdf_from_docx(self, docx_path: str) -> str:
         """
         Convertit un fichier DOCX en PDF
@@ -71,7 +177,7 @@ class DocumentService:
             
             # Création du PDF
             pdf_path = docx_path.replace('.docx', '.pdf')
-            HTML(string=html_content).write_pdf(pdf_path)
+            HTML(string=html_content, url_fetcher=reject_url_fetcher).write_pdf(pdf_path)
             
             return pdf_path
             
@@ -0,0 +1,52 @@
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+# Les réponses portant un ETag restent en cache navigateur mais sont revalidées
+CACHE_CONTROL = "private, no-cache"
+
+
+def entity_etag(kind: str, id: int, created_at: Optional[datetime], updated_at: Optional[datetime]) -> str:
+    """
+    ETag fort d'une ressource, dérivé de son id et de sa dernière modification
+
+    updated_at est horodaté à la microseconde par l'application (voir
+    BaseModel) : deux écritures successives donnent deux ETags distincts.
+    """
+    stamp = updated_at or created_at
+    raw = f"{kind}:{id}:{stamp.isoformat() if stamp else ''}"
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _tags(header: str):
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    If-None-Match : vrai si le client possède déjà cette version (comparaison faible)
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = _tags(header)
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def check_if_match(request: Request, etag: str) -> None:
+    """
+    If-Match : refuse l'écriture (412) si la ressource a changé depuis la
+    version lue par le client (comparaison forte)
+    """
+    header = request.headers.get("if-match")
+    if not header:
+        return
+    tags = _tags(header)
+    if "*" not in tags and etag not in tags:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="La ressource a été modifiée entre-temps, rechargez-la avant de l'enregistrer",
+            headers={"ETag": etag}
+        )
@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, BinaryIO, Callable, Dict, List, Tuple
+
+from app.services.single_flight import SingleFlight
+
+# À incrémenter à chaque changement du rendu DOCX/PDF pour invalider les artefacts
+RENDERER_VERSION = "2"
+
+# Rendus tentés par open() quand l'éviction supprime l'artefact avant son ouverture
+OPEN_ATTEMPTS = 3
+
+# Fichiers temporaires d'un rendu interrompu (processus tué...) supprimés après ce délai
+STALE_TEMP_SECONDS = 3600
+
+
+class ExportArtifactCache:
+    """
+    Cache adressé par contenu des fichiers exportés.
+
+    Un artefact est identifié par l'empreinte de (contenu, format, version du
+    rendu) : réexporter un document inchangé renvoie le fichier existant, et
+    les exports concurrents d'une même clé partagent un seul rendu.
+
+    Le dossier est borné en nombre de fichiers et en taille : après chaque
+    rendu, les artefacts les moins récemment servis (mtime, mis à jour à
+    chaque hit) sont supprimés. Un chemin retourné peut donc disparaître
+    ensuite : les téléchargements passent par open().
+    """
+
+    def __init__(self, directory: Path, max_files: int = 1000, max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._renders = SingleFlight()
+        self.hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(content: str, format: str) -> str:
+        digest = hashlib.sha256()
+        for part in (RENDERER_VERSION, format, content):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def path_for(self, key: str, format: str) -> Path:
+        return self.directory / f"{key}.{format}"
+
+    async def get_or_create(
+        self,
+        content: str,
+        format: str,
+        render: Callable[[str], Awaitable[str]]
+    ) -> str:
+        """
+        Retourne le chemin de l'artefact, en le rendant via `render` si besoin
+
+        `render` reçoit un nom de fichier temporaire (relatif au dossier
+        d'upload, sans extension) et retourne le chemin du fichier produit.
+        """
+        key = self.key(content, format)
+        path = self.path_for(key, format)
+
+        if path.exists():
+            try:
+                # Marque l'artefact comme récemment servi pour l'éviction
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            else:
+                self.hits += 1
+                return str(path)
+
+        # Le rendu continue même si le demandeur se déconnecte
+        return await self._renders.do(key, lambda: self._render(key, path, render))
+
+    async def open(
+        self,
+        content: str,
+        format: str,
+        render: Callable[[str], Awaitable[str]]
+    ) -> BinaryIO:
+        """
+        Ouvre l'artefact (rendu si besoin) et retourne le fichier ouvert
+
+        Un fichier ouvert reste lisible même si l'éviction le supprime
+        ensuite : à préférer au chemin pour servir un téléchargement.
+        Si l'artefact disparaît entre le rendu et l'ouverture, il est
+        rendu à nouveau.
+        """
+        for attempt in range(OPEN_ATTEMPTS):
+            path = await self.get_or_create(content, format, render)
+            try:
+                return open(path, "rb")
+            except FileNotFoundError:
+                if attempt + 1 == OPEN_ATTEMPTS:
+                    raise
+
+    async def _render(self, key: str, path: Path, render: Callable[[str], Awaitable[str]]) -> str:
+        temp_name = f"{self.directory.name}/.{key}.{uuid.uuid4().hex}"
+        temp_path = await render(temp_name)
+        # Remplacement atomique : un artefact n'est jamais visible à moitié écrit
+        os.replace(temp_path, path)
+        await asyncio.to_thread(self._evict, path)
+        return str(path)
+
+    def _evict(self, keep: Path) -> None:
+        """
+        Supprime les artefacts les plus anciens au-delà des limites de taille et de nombre
+        """
+        now = time.time()
+        artifacts: List[Tuple[float, int, Path]] = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.startswith("."):
+                if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                    self._remove(Path(entry.path))
+                continue
+            artifacts.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+
+        count = len(artifacts)
+        total = sum(size for _, size, _ in artifacts)
+        artifacts.sort(key=lambda artifact: artifact[0])
+        for _, size, path in artifacts:
+            if count <= self.max_files and total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            if self._remove(path):
+                self.evictions += 1
+            count -= 1
+            total -= size
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "evictions": self.evictions,
+            "misses": self._renders.calls - self._renders.coalesced,
+            "coalesced": self._renders.coalesced,
+            "in_progress": self._renders.in_flight,
+        }
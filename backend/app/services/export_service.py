@@ -0,0 +1,195 @@
+import asyncio
+import math
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Deque, Dict, Optional
+
+from app.core.config import settings
+from app.services.export_cache import ExportArtifactCache
+
+SUPPORTED_FORMATS = ("docx", "pdf")
+
+MEDIA_TYPES = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+# Service de documents propre à chaque processus du pool
+_document_service = None
+
+
+def _get_document_service():
+    global _document_service
+    if _document_service is None:
+        from app.services.document_service import DocumentService
+        _document_service = DocumentService()
+    return _document_service
+
+
+def render_export(content: str, filename: str, format: str) -> str:
+    """
+    Rend un document dans le format demandé (exécuté dans un processus du pool)
+    """
+    service = _get_document_service()
+    if format == "docx":
+        return service.create_docx(content=content, filename=filename)
+    if format == "pdf":
+        return service.create_pdf(content=content, filename=filename)
+    raise ValueError(f"Format non supporté: {format}")
+
+
+def render_export_bytes(content: str, format: str) -> bytes:
+    """
+    Rend un document en mémoire (exécuté dans un processus du pool)
+    """
+    service = _get_document_service()
+    if format == "docx":
+        return service.render_docx_bytes(content)
+    if format == "pdf":
+        return service.render_pdf_bytes(content)
+    raise ValueError(f"Format non supporté: {format}")
+
+
+class ExportQueueFull(Exception):
+    """Levée quand la file d'export est saturée"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("File d'export saturée")
+        self.retry_after = retry_after
+
+
+class ExportEngine:
+    """
+    Moteur d'export DOCX/PDF adossé à un pool de processus.
+
+    Le rendu (python-docx, mammoth, WeasyPrint) est CPU-bound : il est
+    exécuté hors de la boucle d'événements pour que l'API reste réactive.
+    Au-delà de `max_workers + max_queue` exports en cours, les nouvelles
+    demandes sont refusées avec un délai de réessai estimé.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue: int,
+        artifacts: ExportArtifactCache,
+        latency_window: int = 200
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._latencies: Dict[str, Deque[float]] = {
+            fmt: deque(maxlen=latency_window) for fmt in SUPPORTED_FORMATS
+        }
+        self._completed: Dict[str, int] = {fmt: 0 for fmt in SUPPORTED_FORMATS}
+        self._failed: Dict[str, int] = {fmt: 0 for fmt in SUPPORTED_FORMATS}
+        self.rejected = 0
+        self.artifacts = artifacts
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    def _retry_after(self) -> int:
+        samples = [latency for values in self._latencies.values() for latency in values]
+        average = sum(samples) / len(samples) if samples else 1.0
+        # Temps estimé pour que la file se vide d'une place
+        return max(1, math.ceil(average * (self.queue_depth + 1) / self.max_workers))
+
+    async def run(self, func, *args: Any, format: str) -> Any:
+        """
+        Exécute `func(*args)` dans le pool en appliquant la contre-pression
+        """
+        if self._in_flight >= self.capacity:
+            self.rejected += 1
+            raise ExportQueueFull(self._retry_after())
+
+        self._in_flight += 1
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(self._get_executor(), func, *args)
+        except Exception:
+            self._failed[format] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+        self._latencies[format].append(time.perf_counter() - start)
+        self._completed[format] += 1
+        return result
+
+    async def export(self, content: str, format: str) -> str:
+        """
+        Exporte un contenu et retourne le chemin de l'artefact généré
+
+        Un contenu déjà exporté dans ce format n'est pas rendu à nouveau.
+        """
+        async def render(filename: str) -> str:
+            return await self.run(render_export, content, filename, format, format=format)
+
+        return await self.artifacts.get_or_create(content, format, render)
+
+    async def open_export(self, content: str, format: str) -> BinaryIO:
+        """
+        Exporte un contenu et retourne l'artefact ouvert en lecture binaire
+        """
+        async def render(filename: str) -> str:
+            return await self.run(render_export, content, filename, format, format=format)
+
+        return await self.artifacts.open(content, format, render)
+
+    async def export_bytes(self, content: str, format: str) -> bytes:
+        """
+        Exporte un contenu en mémoire, sans conserver de fichier
+        """
+        return await self.run(render_export_bytes, content, format, format=format)
+
+    def stats(self) -> Dict[str, Any]:
+        formats = {}
+        for fmt, values in self._latencies.items():
+            ordered = sorted(values)
+            formats[fmt] = {
+                "completed": self._completed[fmt],
+                "failed": self._failed[fmt],
+                "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else None,
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1) if ordered else None,
+                "max_ms": round(ordered[-1] * 1000, 1) if ordered else None,
+            }
+        return {
+            "workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "formats": formats,
+            "artifacts": self.artifacts.stats(),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+export_engine = ExportEngine(
+    max_workers=settings.EXPORT_WORKERS,
+    max_queue=settings.EXPORT_MAX_QUEUE,
+    artifacts=ExportArtifactCache(
+        Path(settings.UPLOAD_DIR) / "exports",
+        max_files=settings.EXPORT_CACHE_MAX_FILES,
+        max_bytes=settings.EXPORT_CACHE_MAX_BYTES
+    )
+)
@@ -0,0 +1,225 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.document import Document
+from app.models.generation_job import GenerationJob, GenerationJobStatus
+
+# Jobs tentés par claim() quand d'autres workers réservent les mêmes en même temps
+CLAIM_ATTEMPTS = 5
+
+def job_lease_seconds() -> float:
+    """
+    Durée du bail d'un job, déduite de l'échéance des appels IA
+
+    Un job de génération ne dure pas plus que l'échéance de son appel
+    (réessais compris), plus la dernière attente de réessai et une marge
+    pour les écritures en base : un bail plus court ferait reprendre des
+    jobs encore en cours.
+    """
+    return (
+        settings.LLM_DEADLINE_SECONDS
+        + settings.LLM_RETRY_MAX_DELAY
+        + settings.GENERATION_JOB_LEASE_MARGIN_SECONDS
+    )
+
+class JobService:
+    """
+    File persistante des jobs de génération IA.
+
+    Les jobs sont stockés en base : un worker (worker.py) les réserve pour
+    une durée de bail, et un job dont le bail a expiré (worker arrêté ou
+    planté) est remis en file au démarrage ou à la scrutation suivante.
+    """
+
+    def __init__(self):
+        self.lease = timedelta(seconds=job_lease_seconds())
+        self.max_attempts = settings.GENERATION_JOB_MAX_ATTEMPTS
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        document: Document,
+        job_type: str = "generate",
+        payload: Optional[Dict[str, Any]] = None
+    ) -> GenerationJob:
+        """
+        Soumet un job pour un document
+        """
+        job = GenerationJob(
+            job_type=job_type,
+            status=GenerationJobStatus.PENDING,
+            payload=payload,
+            attempts=0,
+            document_id=document.id,
+            document_version=document.version,
+            user_id=document.user_id
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def get(self, db: AsyncSession, job_id: int, user_id: int) -> Optional[GenerationJob]:
+        return await db.scalar(select(GenerationJob).where(
+            GenerationJob.id == job_id,
+            GenerationJob.user_id == user_id
+        ))
+
+    async def requeue_expired(self, db: AsyncSession) -> int:
+        """
+        Remet en file les jobs dont le bail a expiré
+        """
+        # Mises à jour conditionnelles : un job terminé entre-temps n'est pas touché
+        expired = (
+            GenerationJob.status == GenerationJobStatus.RUNNING,
+            GenerationJob.locked_at < datetime.now(timezone.utc) - self.lease
+        )
+        failed = await db.execute(
+            update(GenerationJob)
+            .where(*expired, GenerationJob.attempts >= self.max_attempts)
+            .values(
+                status=GenerationJobStatus.FAILED,
+                error="Bail expiré après le nombre maximal de tentatives",
+                worker_id=None,
+                locked_at=None
+            )
+            .execution_options(synchronize_session=False)
+        )
+        requeued = await db.execute(
+            update(GenerationJob)
+            .where(*expired)
+            .values(status=GenerationJobStatus.PENDING, worker_id=None, locked_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return failed.rowcount + requeued.rowcount
+
+    async def claim(self, db: AsyncSession, worker_id: str) -> Optional[GenerationJob]:
+        """
+        Réserve le plus ancien job en attente pour ce worker
+
+        Le job réservé porte un identifiant de réservation unique
+        (`worker_id` suivi d'un suffixe aléatoire), à repasser à complete()
+        et fail().
+        """
+        for _ in range(CLAIM_ATTEMPTS):
+            # SKIP LOCKED : plusieurs workers peuvent scruter la file sans se bloquer
+            job_id = await db.scalar(select(GenerationJob.id).where(
+                GenerationJob.status == GenerationJobStatus.PENDING
+            ).order_by(GenerationJob.id).limit(1).with_for_update(skip_locked=True))
+
+            if job_id is None:
+                await db.commit()
+                return None
+
+            # Réservation conditionnelle : SKIP LOCKED n'existe pas sous SQLite,
+            # seule la première tâche à passer le job en RUNNING l'obtient
+            claim_id = f"{worker_id}/{uuid.uuid4().hex[:8]}"
+            claimed = await db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id, GenerationJob.status == GenerationJobStatus.PENDING)
+                .values(
+                    status=GenerationJobStatus.RUNNING,
+                    worker_id=claim_id,
+                    locked_at=datetime.now(timezone.utc),
+                    attempts=GenerationJob.attempts + 1
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if claimed.rowcount == 1:
+                return await db.get(GenerationJob, job_id, populate_existing=True)
+        return None
+
+    async def _release(self, db: AsyncSession, job_id: int, claim_id: str, **values: Any) -> bool:
+        """
+        Clôt une réservation, si elle est toujours celle du job
+        """
+        released = await db.execute(
+            update(GenerationJob)
+            .where(
+                GenerationJob.id == job_id,
+                GenerationJob.worker_id == claim_id,
+                GenerationJob.status == GenerationJobStatus.RUNNING
+            )
+            .values(locked_at=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        return released.rowcount == 1
+
+    async def complete(
+        self,
+        db: AsyncSession,
+        job_id: int,
+        claim_id: str,
+        result: str
+    ) -> Optional[GenerationJobStatus]:
+        """
+        Enregistre le résultat d'un job et met à jour le document
+
+        Le contenu n'est remplacé que si le document n'a pas changé depuis
+        la soumission ; sinon le job passe en CONFLICTED et le résultat
+        reste consultable sur le job. Retourne None (sans effet) si le bail
+        a expiré et que le job a été remis en file ou réservé ailleurs.
+        """
+        job = (await db.execute(
+            select(GenerationJob.document_id, GenerationJob.document_version).where(GenerationJob.id == job_id)
+        )).first()
+        if job is None or not await self._release(
+            db, job_id, claim_id,
+            status=GenerationJobStatus.COMPLETED, result=result, error=None
+        ):
+            await db.rollback()
+            return None
+
+        query = update(Document).where(Document.id == job.document_id)
+        if job.document_version is not None:
+            query = query.where(Document.version == job.document_version)
+        written = await db.execute(
+            query
+            .values(content=result, version=Document.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+        status = GenerationJobStatus.COMPLETED
+        if written.rowcount != 1:
+            status = GenerationJobStatus.CONFLICTED
+            await db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.id == job_id)
+                .values(status=status, error="Document modifié depuis la soumission du job, résultat non appliqué")
+                .execution_options(synchronize_session=False)
+            )
+
+        await db.commit()
+        return status
+
+    async def postpone(self, db: AsyncSession, job_id: int, claim_id: str) -> bool:
+        """
+        Remet un job en file sans décompter de tentative (plafond de l'utilisateur atteint)
+        """
+        released = await self._release(
+            db, job_id, claim_id,
+            status=GenerationJobStatus.PENDING,
+            worker_id=None,
+            attempts=GenerationJob.attempts - 1
+        )
+        await db.commit()
+        return released
+
+    async def fail(self, db: AsyncSession, job_id: int, claim_id: str, error: str) -> bool:
+        """
+        Enregistre l'échec d'un job, qui est retenté tant qu'il reste des tentatives
+        """
+        # Les tentatives ne changent qu'à la réservation : lecture sans course
+        attempts = await db.scalar(select(GenerationJob.attempts).where(GenerationJob.id == job_id))
+        if attempts is not None and attempts >= self.max_attempts:
+            retry = GenerationJobStatus.FAILED
+        else:
+            retry = GenerationJobStatus.PENDING
+        released = await self._release(db, job_id, claim_id, status=retry, error=error, worker_id=None)
+        await db.commit()
+        return released
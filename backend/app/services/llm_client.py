@@ -0,0 +1,214 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.llm_providers import LLMProvider, build_provider
+
+
+class LLMUserLimitExceeded(Exception):
+    """Levée quand un utilisateur a trop de générations en cours"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"Trop de générations en cours (maximum {limit})")
+        self.limit = limit
+
+
+class _Timings:
+    """Durées récentes d'une étape (attente, appel amont)"""
+
+    def __init__(self, window: int = 500):
+        self.count = 0
+        self.total = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self._recent.append(duration)
+
+    def stats(self) -> Dict[str, Any]:
+        ordered = sorted(self._recent)
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else None,
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1) if ordered else None,
+            "max_ms": round(ordered[-1] * 1000, 1) if ordered else None,
+        }
+
+
+class LLMClient:
+    """
+    Client IA asynchrone partagé par le processus.
+
+    - un seul fournisseur (OpenAI ou local), et donc un seul pool de connexions ;
+    - une échéance globale par appel, tentatives comprises ;
+    - des réessais avec backoff exponentiel et jitter sur 429, 5xx et timeouts ;
+    - un sémaphore global sur les appels amont et un plafond par utilisateur.
+    """
+
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        self._provider = provider
+        self.max_concurrency = settings.LLM_MAX_CONCURRENCY
+        self.max_per_user = settings.LLM_MAX_PER_USER
+        self.max_retries = settings.LLM_MAX_RETRIES
+        self.deadline = settings.LLM_DEADLINE_SECONDS
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._in_flight_by_user: Dict[int, int] = {}
+        self.queue_wait = _Timings()
+        self.upstream = _Timings()
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+
+    @property
+    def provider(self) -> LLMProvider:
+        if self._provider is None:
+            self._provider = build_provider()
+        return self._provider
+
+    def _is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, asyncio.TimeoutError) or self.provider.is_retryable(error)
+
+    @asynccontextmanager
+    async def user_slot(self, user_id: Optional[int]):
+        """
+        Réserve une génération pour l'utilisateur, dans la limite de son plafond
+        """
+        if user_id is None:
+            yield
+            return
+        if self._in_flight_by_user.get(user_id, 0) >= self.max_per_user:
+            self.rejected += 1
+            raise LLMUserLimitExceeded(self.max_per_user)
+        self._in_flight_by_user[user_id] = self._in_flight_by_user.get(user_id, 0) + 1
+        try:
+            yield
+        finally:
+            self._in_flight_by_user[user_id] -= 1
+            if not self._in_flight_by_user[user_id]:
+                del self._in_flight_by_user[user_id]
+
+    @asynccontextmanager
+    async def _upstream_slot(self):
+        start = time.perf_counter()
+        async with self._semaphore:
+            self.queue_wait.record(time.perf_counter() - start)
+            yield
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter : entre 0 et base * 2^tentative, plafonné
+        ceiling = min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    async def _with_retries(self, call, deadline_at: float):
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                self.failures += 1
+                raise asyncio.TimeoutError("Échéance de l'appel IA dépassée")
+            try:
+                return await call(remaining)
+            except Exception as e:
+                delay = self._backoff(attempt)
+                if (
+                    not self._is_retryable(e)
+                    or attempt >= self.max_retries
+                    or time.monotonic() + delay >= deadline_at
+                ):
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        user_id: Optional[int] = None
+    ) -> str:
+        """
+        Appel de complétion, avec réessais et limites de concurrence
+        """
+        deadline_at = time.monotonic() + self.deadline
+
+        async def attempt(remaining: float) -> str:
+            async with self._upstream_slot():
+                start = time.perf_counter()
+                try:
+                    return await self.provider.complete(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        timeout=remaining
+                    )
+                finally:
+                    self.upstream.record(time.perf_counter() - start)
+
+        async with self.user_slot(user_id):
+            return await self._with_retries(attempt, deadline_at)
+
+    async def stream_chat(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        user_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """
+        Appel de complétion en streaming
+
+        Les réessais ne portent que sur l'ouverture du flux : une fois des
+        tokens envoyés, une erreur est remontée telle quelle.
+        """
+        deadline_at = time.monotonic() + self.deadline
+
+        async with self.user_slot(user_id):
+            async with self._upstream_slot():
+                start = time.perf_counter()
+
+                async def open_stream(remaining: float):
+                    return await self.provider.open_stream(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        timeout=remaining
+                    )
+
+                try:
+                    stream = await self._with_retries(open_stream, deadline_at)
+                    async for token in stream:
+                        yield token
+                finally:
+                    self.upstream.record(time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": settings.LLM_PROVIDER,
+            "max_concurrency": self.max_concurrency,
+            "in_flight_users": len(self._in_flight_by_user),
+            "queue_wait": self.queue_wait.stats(),
+            "upstream": self.upstream.stats(),
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+        }
+
+    async def close(self) -> None:
+        if self._provider is not None:
+            await self._provider.close()
+            self._provider = None
+
+
+# Client partagé par tous les services IA du processus
+llm_client = LLMClient()
@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import json
+import random
+from typing import AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+
+
+class LLMProvider:
+    """
+    Interface d'un fournisseur de modèle de langage.
+
+    Les réessais, échéances et limites de concurrence sont gérés par
+    LLMClient ; un fournisseur se contente d'exécuter un appel.
+    """
+
+    async def complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        timeout: float
+    ) -> str:
+        raise NotImplementedError
+
+    async def open_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        timeout: float
+    ) -> AsyncIterator[str]:
+        """
+        Ouvre un flux et retourne l'itérateur de ses tokens
+        """
+        raise NotImplementedError
+
+    def is_retryable(self, error: Exception) -> bool:
+        return False
+
+    async def close(self) -> None:
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    """Fournisseur OpenAI, avec un pool de connexions HTTP partagé"""
+
+    def __init__(self):
+        import httpx
+        import openai
+
+        self._openai = openai
+        self._client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=0,  # Réessais gérés par LLMClient, avec l'échéance globale
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_CONNECTIONS
+                ),
+                timeout=httpx.Timeout(settings.LLM_DEADLINE_SECONDS, connect=10.0)
+            )
+        )
+
+    async def complete(self, model, messages, max_tokens, temperature, timeout) -> str:
+        response = await self._client.with_options(timeout=timeout).chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        return response.choices[0].message.content or ""
+
+    async def open_stream(self, model, messages, max_tokens, temperature, timeout) -> AsyncIterator[str]:
+        stream = await self._client.with_options(timeout=timeout).chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True
+        )
+
+        async def tokens() -> AsyncIterator[str]:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        return tokens()
+
+    def is_retryable(self, error: Exception) -> bool:
+        openai = self._openai
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return False
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+class LocalProviderError(Exception):
+    """Erreur simulée par le fournisseur local (équivalent d'un 503)"""
+
+
+_LOCAL_VOCABULARY = (
+    "le prestataire client contrat prestation article montant paiement délai "
+    "livraison conditions obligations parties document service réalisation "
+    "durée signature facture devis validité conformément présent accord "
+    "modalités échéance responsabilité résiliation confidentialité projet"
+).split()
+
+
+class LocalProvider(LLMProvider):
+    """
+    Fournisseur local déterministe, pour les tests de charge et les benchmarks.
+
+    La réponse ne dépend que des messages : deux appels identiques donnent le
+    même texte. La latence du premier token, le débit et le taux d'erreur
+    sont réglables pour simuler un fournisseur réel sans clé ni réseau.
+    """
+
+    def __init__(
+        self,
+        first_token_latency: float,
+        tokens_per_second: float,
+        error_rate: float,
+        output_tokens: int,
+        seed: int = 0
+    ):
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.output_tokens = output_tokens
+        # Tirage des erreurs reproductible d'une exécution à l'autre
+        self._errors = random.Random(seed)
+
+    def _tokens(self, messages: List[Dict[str, str]], max_tokens: int) -> List[str]:
+        raw = json.dumps(messages, ensure_ascii=False, sort_keys=True)
+        rng = random.Random(hashlib.sha256(raw.encode("utf-8")).digest())
+        prompt = messages[-1]["content"]
+
+        if "JSON" in prompt:
+            text = json.dumps({
+                key: " ".join(rng.choice(_LOCAL_VOCABULARY) for _ in range(12))
+                for key in ("grammar", "style", "structure", "content")
+            }, ensure_ascii=False)
+            return [f"{word} " for word in text.split(" ")]
+
+        count = min(max_tokens, self.output_tokens)
+        tokens = ["# DOCUMENT"]
+        while len(tokens) < count:
+            if len(tokens) % 60 == 1:
+                tokens.append(f"\n\n## Article {len(tokens) // 60 + 1}\n\n")
+            tokens.append(f"{rng.choice(_LOCAL_VOCABULARY)} ")
+        return tokens
+
+    async def _maybe_fail(self) -> None:
+        await asyncio.sleep(self.first_token_latency)
+        if self.error_rate and self._errors.random() < self.error_rate:
+            raise LocalProviderError("Erreur simulée du fournisseur local")
+
+    async def complete(self, model, messages, max_tokens, temperature, timeout) -> str:
+        tokens = self._tokens(messages, max_tokens)
+        await asyncio.wait_for(self._generate(len(tokens)), timeout)
+        return "".join(tokens).strip()
+
+    async def _generate(self, count: int) -> None:
+        await self._maybe_fail()
+        if self.tokens_per_second:
+            await asyncio.sleep(count / self.tokens_per_second)
+
+    async def open_stream(self, model, messages, max_tokens, temperature, timeout) -> AsyncIterator[str]:
+        tokens = self._tokens(messages, max_tokens)
+        await asyncio.wait_for(self._maybe_fail(), timeout)
+
+        async def stream() -> AsyncIterator[str]:
+            delay = 1 / self.tokens_per_second if self.tokens_per_second else 0
+            for token in tokens:
+                yield token
+                await asyncio.sleep(delay)
+
+        return stream()
+
+    def is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, LocalProviderError)
+
+
+def build_provider(name: Optional[str] = None) -> LLMProvider:
+    """
+    Construit le fournisseur configuré par LLM_PROVIDER ("openai" ou "local")
+    """
+    name = name or settings.LLM_PROVIDER
+    if name == "openai":
+        return OpenAIProvider()
+    if name == "local":
+        return LocalProvider(
+            first_token_latency=settings.LOCAL_LLM_FIRST_TOKEN_LATENCY,
+            tokens_per_second=settings.LOCAL_LLM_TOKENS_PER_SECOND,
+            error_rate=settings.LOCAL_LLM_ERROR_RATE,
+            output_tokens=settings.LOCAL_LLM_OUTPUT_TOKENS,
+            seed=settings.LOCAL_LLM_SEED
+        )
+    raise ValueError(f"Fournisseur IA inconnu: {name}")
@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import String, literal, tuple_
+from sqlalchemy.sql import Select
+
+
+class InvalidCursor(ValueError):
+    """Levée quand un curseur de pagination ne peut pas être décodé"""
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    Curseur opaque désignant la position (created_at, id) d'une ligne
+    """
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Curseur de pagination invalide") from e
+
+
+def keyset_page(query: Select, model, cursor: Optional[str], limit: int, dialect: str = "") -> Select:
+    """
+    Applique la pagination par clé (created_at, id), du plus récent au plus ancien
+
+    Contrairement à offset, le coût d'une page ne dépend pas de sa
+    profondeur : la base reprend directement après la dernière ligne vue,
+    en suivant les index (…, created_at, id). Une ligne de plus que `limit`
+    est demandée pour savoir s'il existe une page suivante.
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        if dialect == "sqlite":
+            # SQLite compare des chaînes : valeur liée au format stocké par
+            # CURRENT_TIMESTAMP (sans microsecondes), colonne laissée nue pour
+            # que l'index (…, created_at, id) serve au parcours
+            created_at = literal(created_at.strftime("%Y-%m-%d %H:%M:%S"), String)
+        # Comparaison de ligne : une seule borne d'index, quelle que soit la profondeur
+        query = query.where(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence, limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Sépare la page demandée et le curseur de la page suivante (None en fin de liste)
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.responses import row_to_dict
+from app.models.template import Template
+from app.schemas.template import TemplateWithUsage
+
+
+class TemplateEntry(NamedTuple):
+    """Template prêt à sérialiser, avec sa clé de pagination (created_at, id)"""
+    created_at: datetime
+    id: int
+    updated_at: Optional[datetime]
+    payload: Dict[str, Any]
+
+
+def to_entry(template: Template) -> TemplateEntry:
+    return TemplateEntry(
+        created_at=template.created_at,
+        id=template.id,
+        updated_at=template.updated_at,
+        payload=row_to_dict(template, TemplateWithUsage)
+    )
+
+
+def merge_entries(*groups: Sequence[TemplateEntry]) -> List[TemplateEntry]:
+    """Fusionne des listes de templates, du plus récent au plus ancien"""
+    return sorted(
+        (entry for group in groups for entry in group),
+        key=lambda entry: (entry.created_at, entry.id),
+        reverse=True
+    )
+
+
+class PublicTemplateCache:
+    """
+    Catalogue des templates publics, sérialisé une fois par processus.
+
+    Indexé par catégorie pour les listes et par id pour get_template. Les
+    écritures de endpoints/templates.py l'invalident aussitôt ; la durée de
+    vie borne le délai de prise en compte dans les autres workers. Le
+    catalogue ne sert jamais d'ETag : get_template lit la version en base
+    et recharge le catalogue s'il ne correspond plus.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._by_category: Optional[Dict[Optional[str], List[TemplateEntry]]] = None
+        self._by_id: Dict[int, TemplateEntry] = {}
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    def _fresh(self) -> bool:
+        return self._by_category is not None and self._expires_at > time.monotonic()
+
+    async def _snapshot(self, db: AsyncSession):
+        """
+        Index (par catégorie, par id) du catalogue, rechargé s'il est périmé
+        """
+        if self._fresh():
+            self.hits += 1
+            return self._by_category, self._by_id
+        async with self._lock:
+            # Un seul chargement pour toutes les requêtes arrivées entre-temps
+            if self._fresh():
+                self.hits += 1
+                return self._by_category, self._by_id
+            generation = self._generation
+            templates = (await db.scalars(
+                select(Template).where(Template.is_public == True)
+            )).all()
+            entries = merge_entries([to_entry(template) for template in templates])
+            by_category: Dict[Optional[str], List[TemplateEntry]] = {None: entries}
+            for entry in entries:
+                by_category.setdefault(entry.payload["category"].value, []).append(entry)
+            by_id = {entry.id: entry for entry in entries}
+            self.loads += 1
+            # Invalidé pendant le chargement : résultat servi mais pas conservé
+            if generation == self._generation:
+                self._by_category, self._by_id = by_category, by_id
+                self._expires_at = time.monotonic() + self.ttl
+            return by_category, by_id
+
+    async def list(self, db: AsyncSession, category: Optional[str] = None) -> List[TemplateEntry]:
+        """
+        Templates publics (d'une catégorie), du plus récent au plus ancien
+        """
+        by_category, _ = await self._snapshot(db)
+        return by_category.get(category, [])
+
+    async def get(self, db: AsyncSession, template_id: int) -> Optional[TemplateEntry]:
+        _, by_id = await self._snapshot(db)
+        return by_id.get(template_id)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._by_category = None
+        self._by_id = {}
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "templates": len(self._by_id),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+        }
+
+
+# Instance partagée par les endpoints de templates
+public_template_cache = PublicTemplateCache(ttl=settings.PUBLIC_TEMPLATE_CACHE_TTL_SECONDS)
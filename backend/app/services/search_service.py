@@ -0,0 +1,191 @@
+import html
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.document import Document, DocumentType
+
+# Configuration linguistique PostgreSQL (racinisation, mots vides)
+PG_TEXT_CONFIG = "french"
+
+# Délimiteurs de surlignage : caractères de contrôle absents du texte, remplacés
+# par <mark> une fois le snippet échappé
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+# Texte indexé de template_data : toutes les valeurs chaînes du JSON
+_SQLITE_TEMPLATE_TEXT = (
+    "coalesce((SELECT group_concat(value, ' ') FROM json_tree({row}.template_data) "
+    "WHERE type = 'text'), '')"
+)
+
+_SQLITE_DDL = [
+    # rowid = documents.id ; `owner` porte l'utilisateur sous forme de token
+    # pour que le filtrage par utilisateur passe aussi par l'index
+    "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5("
+    "title, content, data, owner, tokenize = 'unicode61 remove_diacritics 2')",
+    f"""CREATE TRIGGER IF NOT EXISTS documents_fts_insert AFTER INSERT ON documents BEGIN
+        INSERT INTO documents_fts(rowid, title, content, data, owner)
+        VALUES (new.id, new.title, coalesce(new.content, ''), {_SQLITE_TEMPLATE_TEXT.format(row="new")}, 'u' || new.user_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS documents_fts_update
+    AFTER UPDATE OF title, content, template_data, user_id ON documents BEGIN
+        DELETE FROM documents_fts WHERE rowid = old.id;
+        INSERT INTO documents_fts(rowid, title, content, data, owner)
+        VALUES (new.id, new.title, coalesce(new.content, ''), {_SQLITE_TEMPLATE_TEXT.format(row="new")}, 'u' || new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS documents_fts_delete AFTER DELETE ON documents BEGIN
+        DELETE FROM documents_fts WHERE rowid = old.id;
+    END""",
+    # Rattrapage des documents créés avant l'index
+    f"""INSERT INTO documents_fts(rowid, title, content, data, owner)
+    SELECT d.id, d.title, coalesce(d.content, ''), {_SQLITE_TEMPLATE_TEXT.format(row="d")}, 'u' || d.user_id
+    FROM documents d WHERE d.id NOT IN (SELECT rowid FROM documents_fts)""",
+]
+
+_PG_DDL = [
+    # Colonne générée : maintenue par PostgreSQL à chaque écriture du document
+    f"""ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{PG_TEXT_CONFIG}', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('{PG_TEXT_CONFIG}', coalesce(content, '')), 'B') ||
+        setweight(jsonb_to_tsvector('{PG_TEXT_CONFIG}', coalesce(template_data::jsonb, '{{}}'::jsonb), '["string"]'), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_documents_search_vector ON documents USING GIN (search_vector)",
+]
+
+_SQLITE_SEARCH = """
+SELECT d.id, d.title, d.document_type, d.status, d.template_id, d.created_at, d.updated_at,
+       bm25(documents_fts, 10.0, 1.0, 2.0, 0.0) AS rank,
+       snippet(documents_fts, 1, :mark_start, :mark_end, '…', 16) AS snippet
+FROM documents_fts
+JOIN documents d ON d.id = documents_fts.rowid
+WHERE documents_fts MATCH :match {filters}
+ORDER BY rank
+LIMIT :limit
+"""
+
+# Classement sur l'index GIN, puis extraits calculés sur la seule page retenue
+_PG_SEARCH = f"""
+WITH query AS (SELECT websearch_to_tsquery('{PG_TEXT_CONFIG}', :q) AS tsquery),
+ranked AS (
+    SELECT d.id, ts_rank_cd(d.search_vector, query.tsquery) AS rank
+    FROM documents d, query
+    WHERE d.user_id = :user_id AND d.search_vector @@ query.tsquery {{filters}}
+    ORDER BY rank DESC, d.id DESC
+    LIMIT :limit
+)
+SELECT d.id, d.title, d.document_type, d.status, d.template_id, d.created_at, d.updated_at,
+       ranked.rank,
+       ts_headline('{PG_TEXT_CONFIG}', coalesce(d.content, d.title), query.tsquery,
+                   'StartSel=' || :mark_start || ', StopSel=' || :mark_end || ', MaxWords=30, MinWords=10')
+           AS snippet
+FROM ranked JOIN documents d ON d.id = ranked.id, query
+ORDER BY ranked.rank DESC, d.id DESC
+"""
+
+
+def install_search_index(connection: Connection) -> None:
+    """
+    Crée l'index plein texte des documents s'il n'existe pas (idempotent)
+
+    SQLite : table FTS5 tenue à jour par des triggers. PostgreSQL :
+    colonne tsvector générée et index GIN. Les autres bases n'ont pas de
+    recherche.
+    """
+    dialect = connection.dialect.name
+    statements = _SQLITE_DDL if dialect == "sqlite" else _PG_DDL if dialect == "postgresql" else []
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def fts5_match(query: str, user_id: int) -> Optional[str]:
+    """
+    Traduit une recherche libre en expression FTS5, sans syntaxe utilisateur
+
+    Chaque mot devient un terme entre guillemets (tous requis), le dernier
+    en préfixe pour la recherche au fil de la frappe.
+    """
+    terms = _TERM_RE.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return f"owner : u{user_id} AND {{title content data}} : ({' '.join(quoted)})"
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """Échappe le snippet puis remplace les délimiteurs par <mark>"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _timestamp(value):
+    return value.isoformat() if value is not None else None
+
+
+async def search_documents(
+    db: AsyncSession,
+    user_id: int,
+    query: str,
+    limit: int = 20,
+    document_type: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Recherche classée dans les documents d'un utilisateur (titre, contenu,
+    valeurs de template_data), avec un extrait surligné par résultat
+    """
+    dialect = db.bind.dialect.name
+    params: Dict[str, Any] = {
+        "user_id": user_id,
+        "limit": limit,
+        "mark_start": _MARK_START,
+        "mark_end": _MARK_END,
+    }
+    filters = ""
+    if document_type:
+        filters = "AND d.document_type = :document_type"
+        # L'enum est stocké par nom ; ValueError si le type est inconnu
+        params["document_type"] = DocumentType(document_type).name
+
+    if dialect == "sqlite":
+        match = fts5_match(query, user_id)
+        if match is None:
+            return []
+        params["match"] = match
+        statement = _SQLITE_SEARCH.format(filters=filters)
+    elif dialect == "postgresql":
+        params["q"] = query
+        statement = _PG_SEARCH.format(filters=filters)
+    else:
+        raise NotImplementedError(f"Recherche plein texte non disponible pour {dialect}")
+
+    # Types des colonnes lues en SQL brut : enums et dates convertis comme par l'ORM
+    columns = Document.__table__.c
+    statement = text(statement).columns(
+        document_type=columns.document_type.type,
+        status=columns.status.type,
+        created_at=columns.created_at.type,
+        updated_at=columns.updated_at.type
+    )
+    rows = (await db.execute(statement, params)).mappings().all()
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "document_type": row["document_type"].value,
+            "status": row["status"].value if row["status"] else None,
+            "template_id": row["template_id"],
+            "created_at": _timestamp(row["created_at"]),
+            "updated_at": _timestamp(row["updated_at"]),
+            # bm25 : plus petit = plus pertinent ; exposé en score croissant
+            "rank": -row["rank"] if dialect == "sqlite" else row["rank"],
+            "snippet": highlight(row["snippet"]),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Regroupe les appels concurrents portant sur une même clé.
+
+    Le premier appelant lance l'opération ; les suivants attendent son
+    résultat (ou son erreur) au lieu de la relancer. L'opération continue
+    même si l'appelant qui l'a lancée est annulé.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, "asyncio.Future[Any]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+
+        future = self._pending.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(func())
+        self._pending[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(future)
+
+    def _finish(self, key: str, future: "asyncio.Future[Any]") -> None:
+        if self._pending.get(key) is future:
+            del self._pending[key]
+        # Erreur consommée même si tous les appelants ont été annulés
+        if not future.cancelled():
+            future.exception()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+            "coalesced_rate": round(self.coalesced / self.calls, 3) if self.calls else None,
+        }
@@ -0,0 +1,77 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict
+
+from jinja2 import Environment, Template
+
+from app.core.config import settings
+
+
+class TemplateCache:
+    """
+    Cache LRU borné des templates Jinja2 compilés.
+
+    Les entrées sont indexées par l'empreinte du contenu afin qu'un même
+    contenu ne soit lexé, parsé et compilé qu'une seule fois. Un template
+    modifié a une nouvelle empreinte : l'ancienne version n'est plus
+    demandée et finit évincée, sans invalidation explicite.
+    """
+
+    def __init__(self, env: Environment, max_size: int = 128):
+        self.env = env
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Template]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def content_hash(template_content: str) -> str:
+        return hashlib.sha256(template_content.encode("utf-8")).hexdigest()
+
+    def get(self, template_content: str) -> Template:
+        """
+        Retourne le template compilé, en le compilant si nécessaire
+        """
+        key = self.content_hash(template_content)
+
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return template
+            self.misses += 1
+
+        # Compilation hors verrou : deux compilations concurrentes du même
+        # contenu produisent le même résultat, la seconde écrase la première.
+        template = self.env.from_string(template_content)
+
+        with self._lock:
+            self._entries[key] = template
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return template
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Instance partagée par le service de documents et les endpoints de templates
+template_cache = TemplateCache(Environment(), max_size=settings.TEMPLATE_CACHE_SIZE)
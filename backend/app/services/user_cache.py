@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect
+
+from app.core.config import settings
+from app.models.user import User
+
+# Colonnes suffisantes pour l'authentification et les contrôles d'accès
+CACHED_FIELDS = ("id", "email", "is_active", "is_superuser")
+
+
+class UserCache:
+    """
+    Cache LRU borné, à durée de vie courte, des utilisateurs authentifiés.
+
+    Indexé par le sujet du token (email), il évite la requête `users` à
+    chaque appel authentifié. Toute écriture ORM d'un utilisateur
+    (désactivation, droits, email...) l'invalide, voir les événements en
+    fin de module. L'invalidation est propre au processus : la durée de vie
+    borne le délai de prise en compte des écritures faites par les autres
+    workers ou hors ORM (UPDATE en masse, SQL direct).
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne les champs en cache de l'utilisateur, ou None
+        """
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is not None and entry[1] >= time.monotonic():
+                self._entries.move_to_end(subject)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[subject]
+            self.misses += 1
+            return None
+
+    def set(self, subject: str, user) -> None:
+        if not self.ttl or not self.max_size:
+            return
+        fields = {name: getattr(user, name) for name in CACHED_FIELDS}
+        with self._lock:
+            self._entries[subject] = (fields, time.monotonic() + self.ttl)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *subjects: str) -> None:
+        """
+        Oublie les utilisateurs donnés (profil modifié, action d'administration)
+        """
+        with self._lock:
+            for subject in subjects:
+                if self._entries.pop(subject, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+# Instance partagée par get_current_user et les endpoints utilisateurs
+user_cache = UserCache(max_size=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(User, "after_update")
+def forget_updated_user(mapper, connection, target):
+    """Oublie l'utilisateur modifié, sous son email actuel et l'ancien s'il a changé"""
+    previous = inspect(target).attrs.email.history.deleted or ()
+    user_cache.invalidate(target.email, *previous)
+
+
+@event.listens_for(User, "after_delete")
+def forget_deleted_user(mapper, connection, target):
+    user_cache.invalidate(target.email)
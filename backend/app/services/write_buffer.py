@@ -0,0 +1,302 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.document import Document, DocumentStatus
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingWrite:
+    """Champs en attente d'écriture pour un document, et la version sur laquelle ils portent"""
+
+    def __init__(self, user_id: int, base_version: int):
+        self.user_id = user_id
+        self.base_version = base_version
+        self.fields: Dict[str, Any] = {}
+        self.writes = 0
+        self.first_at = time.monotonic()
+
+    @property
+    def version(self) -> int:
+        """Version du document une fois la rafale écrite"""
+        return self.base_version + 1 if "content" in self.fields else self.base_version
+
+
+class DraftConflict(NamedTuple):
+    """Rafale rejetée au flush : le document avait changé en base"""
+    user_id: int
+    base_version: int
+    version: Optional[int]  # Version trouvée en base (None : document supprimé)
+    status: Optional[str]
+    writes: int
+
+
+class DraftWriteBuffer:
+    """
+    Tampon d'écriture différée des brouillons (sauvegarde automatique).
+
+    Les mises à jour successives d'un document sont fusionnées en mémoire
+    et acquittées aussitôt ; un flush périodique les écrit en une
+    transaction, une seule UPDATE par document. Un changement de statut,
+    toute autre route touchant le document (lecture, génération, export...)
+    et l'arrêt du processus déclenchent un flush immédiat.
+
+    Chaque rafale retient la version du document sur laquelle elle porte ;
+    le flush est conditionnel (même version, toujours brouillon). Une
+    rafale dont le document a changé entre-temps (job de génération, PATCH
+    ou PUT servi par un autre processus, document finalisé) n'écrase rien :
+    elle est conservée comme conflit, signalé par un 409 à la prochaine
+    écriture tamponnée et par draft_status().
+
+    Le tampon est propre au processus : seules les routes de ce processus
+    flushent avant de lire. Un autre worker lit la base et peut servir
+    l'état d'avant la rafale pendant au plus `interval` secondes.
+    """
+
+    def __init__(self, interval: float = 2.0, max_pending: int = 1000):
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: Dict[int, _PendingWrite] = {}
+        # Rafales en cours d'écriture, pas encore validées
+        self._flushing: Dict[int, _PendingWrite] = {}
+        self._conflicts: Dict[int, DraftConflict] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.received = 0
+        self.absorbed = 0
+        self.written = 0
+        self.flushes = 0
+        self.forced = 0
+        self.failures = 0
+        self.conflicts = 0
+
+    def pending_versions(self, document_id: int, user_id: int) -> Optional[Tuple[int, int]]:
+        """
+        (version de base, version après écriture) de la rafale en attente d'un utilisateur
+        """
+        pending = self._pending.get(document_id)
+        if pending is None or pending.user_id != user_id:
+            return None
+        return pending.base_version, pending.version
+
+    def put(self, document_id: int, user_id: int, base_version: int, fields: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        Met en attente une mise à jour
+
+        `base_version` (version lue en base) n'est retenue qu'à la première
+        écriture d'une rafale. Retourne le nombre d'écritures fusionnées et
+        la version qu'aura le document une fois la rafale écrite.
+        """
+        pending = self._pending.get(document_id)
+        if pending is None:
+            pending = self._pending[document_id] = _PendingWrite(user_id, base_version)
+        else:
+            self.absorbed += 1
+        pending.fields.update(fields)
+        pending.writes += 1
+        self.received += 1
+        return pending.writes, pending.version
+
+    def take_conflict(self, document_id: int, user_id: int) -> Optional[DraftConflict]:
+        """Retire et retourne le conflit non encore signalé d'un document"""
+        conflict = self._conflicts.get(document_id)
+        if conflict is None or conflict.user_id != user_id:
+            return None
+        return self._conflicts.pop(document_id)
+
+    def draft_status(self, document_id: int, user_id: int) -> Dict[str, Any]:
+        """État de la sauvegarde automatique d'un document, pour le client qui l'édite"""
+        pending = self._pending.get(document_id) or self._flushing.get(document_id)
+        if pending is not None and pending.user_id != user_id:
+            pending = None
+        conflict = self._conflicts.get(document_id)
+        if conflict is not None and conflict.user_id != user_id:
+            conflict = None
+        return {
+            "id": document_id,
+            "pending": pending is not None,
+            "buffered_writes": pending.writes if pending else 0,
+            "version": pending.version if pending else None,
+            "conflict": {
+                "base_version": conflict.base_version,
+                "version": conflict.version,
+                "status": conflict.status,
+                "lost_writes": conflict.writes,
+            } if conflict else None,
+        }
+
+    def discard(self, document_id: int) -> None:
+        """Oublie les écritures et le conflit d'un document (suppression, écriture directe)"""
+        self._pending.pop(document_id, None)
+        self._conflicts.pop(document_id, None)
+
+    @property
+    def full(self) -> bool:
+        return len(self._pending) >= self.max_pending
+
+    async def _write(self, db: AsyncSession, batch: Dict[int, _PendingWrite]) -> int:
+        """
+        Écrit un lot et retourne le nombre de documents écrits
+        """
+        written = 0
+        rejected = []
+        for document_id, pending in batch.items():
+            values = dict(pending.fields)
+            if "content" in values:
+                # Même règle que l'événement before_update de Document
+                values["version"] = pending.version
+            result = await db.execute(
+                update(Document)
+                .where(
+                    Document.id == document_id,
+                    Document.user_id == pending.user_id,
+                    Document.version == pending.base_version,
+                    Document.status == DocumentStatus.DRAFT
+                )
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 1:
+                written += 1
+            else:
+                rejected.append(document_id)
+
+        conflicts = {}
+        if rejected:
+            current = {
+                row.id: row for row in (await db.execute(
+                    select(Document.id, Document.version, Document.status).where(Document.id.in_(rejected))
+                )).all()
+            }
+            for document_id in rejected:
+                pending, row = batch[document_id], current.get(document_id)
+                conflicts[document_id] = DraftConflict(
+                    user_id=pending.user_id,
+                    base_version=pending.base_version,
+                    version=row.version if row else None,
+                    status=row.status.value if row and row.status else None,
+                    writes=pending.writes
+                )
+        await db.commit()
+
+        self._conflicts.update(conflicts)
+        self.conflicts += len(conflicts)
+        return written
+
+    def _restore(self, batch: Dict[int, _PendingWrite]) -> None:
+        # Échec d'écriture : remise en attente sous les écritures plus récentes
+        for document_id, pending in batch.items():
+            newer = self._pending.get(document_id)
+            if newer is not None:
+                pending.fields.update(newer.fields)
+                pending.writes += newer.writes
+            self._pending[document_id] = pending
+
+    async def flush(self, document_ids: Optional[List[int]] = None, db: Optional[AsyncSession] = None) -> int:
+        """
+        Écrit les mises à jour en attente (toutes, ou celles des documents donnés)
+        """
+        async with self._lock:
+            if document_ids is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {
+                    document_id: self._pending.pop(document_id)
+                    for document_id in document_ids if document_id in self._pending
+                }
+            if not batch:
+                return 0
+            self._flushing = batch
+            try:
+                if db is not None:
+                    written = await self._write(db, batch)
+                else:
+                    async with AsyncSessionLocal() as session:
+                        written = await self._write(session, batch)
+            except Exception:
+                self.failures += 1
+                self._restore(batch)
+                raise
+            finally:
+                self._flushing = {}
+            self.flushes += 1
+            self.written += written
+            return written
+
+    async def flush_document(self, db: AsyncSession, document_id: int) -> None:
+        """
+        Écrit les mises à jour en attente d'un document avant qu'une route ne le lise ou le modifie
+
+        Attend aussi le flush en cours s'il porte sur ce document.
+        """
+        if document_id in self._pending or document_id in self._flushing:
+            self.forced += 1
+            await self.flush([document_id], db=db)
+
+    async def flush_user(self, db: AsyncSession, user_id: int) -> None:
+        """
+        Écrit les mises à jour en attente des documents d'un utilisateur (listes, recherche)
+        """
+        document_ids = [
+            document_id
+            for group in (self._pending, self._flushing)
+            for document_id, pending in group.items()
+            if pending.user_id == user_id
+        ]
+        if document_ids:
+            self.forced += 1
+            await self.flush(document_ids, db=db)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flush des brouillons en échec, nouvel essai dans %ss", self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Arrête le flush périodique puis écrit tout ce qui reste en attente"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = min((pending.first_at for pending in self._pending.values()), default=None)
+        return {
+            "enabled": settings.DRAFT_WRITE_BUFFER_ENABLED,
+            "interval_seconds": self.interval,
+            "pending_documents": len(self._pending),
+            "oldest_pending_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else None,
+            "received": self.received,
+            "absorbed": self.absorbed,
+            "written": self.written,
+            "flushes": self.flushes,
+            "forced": self.forced,
+            "failures": self.failures,
+            "conflicts": self.conflicts,
+            "unreported_conflicts": len(self._conflicts),
+        }
+
+
+# Instance partagée par les endpoints de documents
+draft_write_buffer = DraftWriteBuffer(
+    interval=settings.DRAFT_WRITE_FLUSH_INTERVAL,
+    max_pending=settings.DRAFT_WRITE_MAX_PENDING
+)
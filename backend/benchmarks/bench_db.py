@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'accès base de données sous concurrence : session synchrone
+(appels bloquants dans la boucle d'événements, comme les anciennes routes)
+contre AsyncSession.
+
+Chaque « requête » reproduit le motif d'une route : lecture de l'utilisateur
+puis d'une page de documents.
+
+Usage:
+    python benchmarks/bench_db.py [--database-url sqlite:///./bench.db]
+        [--requests 500] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import get_async_database_url
+from app.models import Base, Document, DocumentType, User
+
+
+def prepare(url: str, documents: int) -> int:
+    """Crée les tables et un utilisateur avec quelques documents"""
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        user = db.scalar(select(User).where(User.email == "bench@draftly.local"))
+        if user is None:
+            user = User(email="bench@draftly.local", hashed_password="x", full_name="Bench")
+            db.add(user)
+            db.flush()
+            db.add_all(
+                Document(title=f"Document {index}", document_type=DocumentType.DEVIS,
+                         content="Contenu " * 50, user_id=user.id)
+                for index in range(documents)
+            )
+            db.commit()
+        user_id = user.id
+    engine.dispose()
+    return user_id
+
+
+async def run_sync(url: str, user_id: int, requests: int, concurrency: int) -> float:
+    engine = create_engine(url, pool_size=concurrency, max_overflow=0)
+    SessionLocal = sessionmaker(bind=engine)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            # Même motif que les routes `async def` avec une Session synchrone
+            with SessionLocal() as db:
+                db.get(User, user_id)
+                db.scalars(select(Document).where(Document.user_id == user_id).limit(20)).all()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return requests / elapsed
+
+
+async def run_async(url: str, user_id: int, requests: int, concurrency: int) -> float:
+    engine = create_async_engine(get_async_database_url(url), pool_size=concurrency, max_overflow=0)
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            async with SessionLocal() as db:
+                await db.get(User, user_id)
+                (await db.scalars(select(Document).where(Document.user_id == user_id).limit(20))).all()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="sqlite:///./bench_db.db")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--documents", type=int, default=200)
+    args = parser.parse_args()
+
+    user_id = prepare(args.database_url, args.documents)
+    print(f"{args.requests} requêtes, concurrence {args.concurrency}, base {args.database_url}")
+
+    sync_rate = asyncio.run(run_sync(args.database_url, user_id, args.requests, args.concurrency))
+    print(f"{'session synchrone':<20} {sync_rate:8.1f} requêtes/s")
+
+    async_rate = asyncio.run(run_async(args.database_url, user_id, args.requests, args.concurrency))
+    print(f"{'AsyncSession':<20} {async_rate:8.1f} requêtes/s  (x{async_rate / sync_rate:.2f})")
+
+
+if __name__ == "__main__":
+    main()
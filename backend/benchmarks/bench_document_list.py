@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark de GET /documents : lignes ORM complètes sérialisées par Pydantic
+contre la projection de liste (view=summary) sérialisée depuis les tuples.
+
+Mesure la latence (requête + sérialisation JSON) et la taille de la réponse.
+
+Usage:
+    python benchmarks/bench_document_list.py [--rows 100] [--content-size 20000]
+        [--iterations 50] [--database-url sqlite:///./bench_list.db]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Document, DocumentType, Template, TemplateCategory, User
+from app.schemas.document import DocumentWithTemplate
+from app.services.document_listing import attach_template_names, full_query, serialize_summaries, summary_query
+from app.services.pagination import keyset_page, split_page
+
+
+def prepare(SessionLocal, rows: int, content_size: int) -> int:
+    with SessionLocal() as db:
+        user = db.scalar(select(User).where(User.email == "bench-list@draftly.local"))
+        if user is not None:
+            return user.id
+        user = User(email="bench-list@draftly.local", hashed_password="x", full_name="Bench")
+        db.add(user)
+        db.flush()
+        template = Template(name="Devis standard", category=TemplateCategory.FREELANCE,
+                            template_content="{{ client }}", user_id=user.id)
+        db.add(template)
+        db.flush()
+        db.add_all(
+            Document(
+                title=f"Devis {index}",
+                document_type=DocumentType.DEVIS,
+                content=("Lorem ipsum dolor sit amet. " * (content_size // 28 + 1))[:content_size],
+                template_data={"client": {"nom": f"Client {index}"}, "lignes": list(range(50))},
+                template_id=template.id,
+                user_id=user.id
+            )
+            for index in range(rows)
+        )
+        db.commit()
+        return user.id
+
+
+def full_listing(db, user_id: int, rows: int) -> bytes:
+    # Même enchaînement que GET /documents : la dernière ligne sert au curseur suivant
+    query = keyset_page(full_query(user_id), Document, None, rows - 1, "sqlite")
+    documents, _ = split_page(attach_template_names(db.execute(query).all()), rows - 1)
+    payload = [DocumentWithTemplate.model_validate(document).model_dump(mode="json") for document in documents]
+    return json.dumps(payload).encode("utf-8")
+
+
+def summary_listing(db, user_id: int, rows: int) -> bytes:
+    query = keyset_page(summary_query(user_id), Document, None, rows - 1, "sqlite")
+    result, _ = split_page(db.execute(query).all(), rows - 1)
+    return json.dumps(serialize_summaries(result)).encode("utf-8")
+
+
+def measure(label, SessionLocal, func, user_id, rows, iterations):
+    durations = []
+    size = 0
+    for _ in range(iterations):
+        # Nouvelle session à chaque itération, comme une requête HTTP
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            size = len(func(db, user_id, rows))
+            durations.append(time.perf_counter() - start)
+    print(
+        f"{label:<10} médiane {statistics.median(durations) * 1000:8.2f} ms"
+        f"  max {max(durations) * 1000:8.2f} ms  réponse {size / 1024:9.1f} Ko"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--content-size", type=int, default=20000, help="Taille de `content` en caractères")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--database-url", default="sqlite:///./bench_list.db")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    user_id = prepare(SessionLocal, args.rows, args.content_size)
+
+    print(f"{args.rows} documents par page, contenu de {args.content_size} caractères")
+    measure("complet", SessionLocal, full_listing, user_id, args.rows, args.iterations)
+    measure("résumé", SessionLocal, summary_listing, user_id, args.rows, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
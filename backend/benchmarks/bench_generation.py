@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark hors ligne de la chaîne génération IA + export, avec le
+fournisseur local déterministe (aucune clé OpenAI nécessaire).
+
+Usage:
+    python benchmarks/bench_generation.py [--requests 50] [--concurrency 10]
+        [--first-token 0.5] [--tokens-per-second 50] [--error-rate 0.0]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings
+
+
+def percentile(values, ratio):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def report(label, durations):
+    print(
+        f"{label:<22} médiane {statistics.median(durations) * 1000:8.1f} ms"
+        f"  p95 {percentile(durations, 0.95) * 1000:8.1f} ms"
+    )
+
+
+async def run(args):
+    from app.services.ai_service import AIService
+    from app.services.export_service import export_engine
+
+    ai_service = AIService()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    generation, first_token, export = [], [], []
+    errors = 0
+
+    async def one(index: int):
+        nonlocal errors
+        # Données distinctes : chaque requête atteint le fournisseur
+        template_data = {"client": {"nom": f"Client {index}"}, "montant": 1000 + index}
+        async with semaphore:
+            try:
+                start = time.perf_counter()
+                if args.stream:
+                    parts = []
+                    async for token in ai_service.stream_document_content(
+                        template_content="", template_data=template_data, document_type="contrat"
+                    ):
+                        if not parts:
+                            first_token.append(time.perf_counter() - start)
+                        parts.append(token)
+                    content = "".join(parts)
+                else:
+                    content = await ai_service.generate_document_content(
+                        template_content="", template_data=template_data, document_type="contrat"
+                    )
+                generation.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                await export_engine.export_bytes(content, args.format)
+                export.append(time.perf_counter() - start)
+            except Exception as e:
+                errors += 1
+                print(f"Requête {index} en échec: {e}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{args.requests} requêtes, concurrence {args.concurrency}, "
+        f"premier token {args.first_token}s, {args.tokens_per_second} tokens/s"
+    )
+    if first_token:
+        report("premier token", first_token)
+    if generation:
+        report("génération", generation)
+    if export:
+        report(f"export {args.format}", export)
+    print(f"débit: {len(export) / elapsed:.2f} documents/s, erreurs: {errors}")
+    print(f"client IA: {ai_service.client.stats()}")
+
+    export_engine.shutdown()
+    await ai_service.client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--first-token", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--format", choices=("docx", "pdf"), default="pdf")
+    parser.add_argument("--stream", action="store_true", help="Mesure aussi le premier token")
+    args = parser.parse_args()
+
+    settings.LLM_PROVIDER = "local"
+    settings.LOCAL_LLM_FIRST_TOKEN_LATENCY = args.first_token
+    settings.LOCAL_LLM_TOKENS_PER_SECOND = args.tokens_per_second
+    settings.LOCAL_LLM_ERROR_RATE = args.error_rate
+    settings.AI_CACHE_ENABLED = False
+    settings.LLM_MAX_PER_USER = args.concurrency
+    settings.UPLOAD_DIR = tempfile.mkdtemp(prefix="draftly-bench-")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
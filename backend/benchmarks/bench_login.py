@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark des connexions en rafale : vérification bcrypt dans la boucle
+d'événements (ancien chemin) contre le pool de threads de PasswordHasher.
+
+Mesure le débit de connexions et le retard de la boucle d'événements, qui
+correspond à l'attente imposée aux autres requêtes du worker.
+
+Usage:
+    python benchmarks/bench_login.py [--logins 100] [--rounds 12] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings
+
+
+async def heartbeat(lags, stop: asyncio.Event, interval: float = 0.01):
+    """Mesure le retard de réveil de la boucle d'événements"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(label, login, logins: int):
+    lags = []
+    stop = asyncio.Event()
+    monitor = asyncio.ensure_future(heartbeat(lags, stop))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+    assert all(valid for valid, _ in results)
+    print(
+        f"{label:<22} {logins / elapsed:7.1f} connexions/s"
+        f"  retard boucle max {max(lags) * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    settings.PASSWORD_HASH_ROUNDS = args.rounds
+    settings.PASSWORD_HASH_WORKERS = args.workers
+    settings.PASSWORD_HASH_MAX_PENDING = args.logins
+
+    from app.core.security import PasswordHasher, pwd_context
+
+    hashed = pwd_context.hash("mot-de-passe")
+    hasher = PasswordHasher(max_workers=args.workers, max_pending=args.logins)
+
+    async def inline_login():
+        # Ancien chemin : bcrypt bloque la boucle pendant toute la vérification
+        return pwd_context.verify_and_update("mot-de-passe", hashed)
+
+    async def pooled_login():
+        return await hasher.verify_and_update("mot-de-passe", hashed)
+
+    print(f"{args.logins} connexions simultanées, coût bcrypt {args.rounds}, {args.workers} threads")
+    asyncio.run(run("dans la boucle", inline_login, args.logins))
+    asyncio.run(run("pool de threads", pooled_login, args.logins))
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'export PDF : chaîne historique (DOCX -> mammoth -> WeasyPrint)
+contre le rendu direct Markdown -> HTML -> PDF.
+
+Usage:
+    python benchmarks/bench_pdf_export.py [--iterations 20]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings
+
+SAMPLE_DATA = {
+    "prestataire": {"nom": "Studio Exemple", "adresse": "1 rue de la Paix, Paris",
+                    "telephone": "01 23 45 67 89", "email": "contact@exemple.fr"},
+    "client": {"nom": "Client SA", "adresse": "10 avenue des Champs, Lyon",
+               "telephone": "04 00 00 00 00", "email": "achats@client.fr"},
+    "objet_prestation": "la refonte du site internet",
+    "date_debut": "01/01/2025",
+    "duree": "6 mois",
+    "montant": "12 000",
+    "modalites_paiement": "30% à la commande, solde à la livraison. " * 10,
+    "obligations": "Le Prestataire s'engage à livrer dans les délais convenus. " * 20,
+}
+
+
+def measure(label, func, iterations):
+    durations = []
+    tracemalloc.start()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<10} médiane {statistics.median(durations) * 1000:8.1f} ms"
+        f"  p95 {sorted(durations)[int(len(durations) * 0.95) - 1] * 1000:8.1f} ms"
+        f"  pic mémoire {peak / 1024 / 1024:6.1f} Mo"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.UPLOAD_DIR = tempfile.mkdtemp(prefix="draftly-bench-")
+
+    from app.services.document_service import DocumentService
+
+    service = DocumentService()
+    content = service.create_contrat_template(SAMPLE_DATA)
+
+    def legacy():
+        docx_path = service.create_docx(content=content, filename="bench_legacy")
+        service.create_pdf_from_docx(docx_path)
+
+    def direct():
+        service.create_pdf(content=content, filename="bench_direct")
+
+    # Préchauffage (imports, polices, feuille de style)
+    legacy()
+    direct()
+
+    print(f"Export PDF d'un contrat ({len(content)} caractères), {args.iterations} itérations")
+    measure("docx+pdf", legacy, args.iterations)
+    measure("direct", direct, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la recherche plein texte (GET /documents/search) sur un grand
+volume de documents répartis entre plusieurs utilisateurs.
+
+La base est remplie une seule fois (réutilisée aux exécutions suivantes),
+puis chaque recherche est chronométrée de bout en bout (requête, classement,
+extraits).
+
+Usage:
+    python benchmarks/bench_search.py [--documents 1000000] [--users 1000]
+        [--database-url sqlite:///./bench_search.db] [--searches 200]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.database import get_async_database_url
+from app.models import Base, Document, DocumentType, User
+from app.services.search_service import install_search_index, search_documents
+
+VOCABULARY = (
+    "prestation client contrat devis facture paiement livraison délai site internet "
+    "refonte conseil audit formation maintenance hébergement licence logiciel projet "
+    "société échéance acompte solde garantie confidentialité résiliation avenant"
+).split()
+
+
+def populate(url: str, documents: int, users: int, batch: int = 10000) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        install_search_index(connection)
+        existing = connection.scalar(select(func.count()).select_from(Document))
+        if existing >= documents:
+            return
+        if not connection.scalar(select(func.count()).select_from(User)):
+            connection.execute(insert(User), [
+                {"email": f"user{index}@bench.local", "full_name": f"User {index}", "hashed_password": "x"}
+                for index in range(users)
+            ])
+        user_ids = connection.scalars(select(User.id)).all()
+
+    rng = random.Random(0)
+    remaining = documents - existing
+    print(f"Insertion de {remaining} documents...")
+    while remaining > 0:
+        count = min(batch, remaining)
+        rows = [
+            {
+                "title": f"{rng.choice(VOCABULARY).capitalize()} {rng.randint(1, 99999)}",
+                "document_type": rng.choice(list(DocumentType)),
+                "content": " ".join(rng.choice(VOCABULARY) for _ in range(300)),
+                "template_data": {"client": {"nom": f"Client {rng.randint(1, 5000)}"}},
+                "user_id": rng.choice(user_ids),
+            }
+            for _ in range(count)
+        ]
+        # Les triggers / la colonne générée indexent au fil de l'insertion
+        with engine.begin() as connection:
+            connection.execute(insert(Document), rows)
+        remaining -= count
+    engine.dispose()
+
+
+async def run(url: str, users: int, searches: int, limit: int) -> None:
+    engine = create_async_engine(get_async_database_url(url))
+    SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rng = random.Random(1)
+
+    async with SessionLocal() as db:
+        user_ids = (await db.scalars(select(User.id).limit(users))).all()
+
+    durations, results = [], []
+    for _ in range(searches):
+        terms = " ".join(rng.sample(VOCABULARY, rng.randint(1, 2)))
+        async with SessionLocal() as db:
+            start = time.perf_counter()
+            found = await search_documents(db, rng.choice(user_ids), terms, limit)
+            durations.append(time.perf_counter() - start)
+            results.append(len(found))
+
+    ordered = sorted(durations)
+    print(
+        f"{searches} recherches : médiane {statistics.median(durations) * 1000:.1f} ms"
+        f"  p95 {ordered[int(len(ordered) * 0.95) - 1] * 1000:.1f} ms"
+        f"  max {ordered[-1] * 1000:.1f} ms"
+        f"  ({statistics.mean(results):.1f} résultats en moyenne)"
+    )
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--database-url", default="sqlite:///./bench_search.db")
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    populate(args.database_url, args.documents, args.users)
+    asyncio.run(run(args.database_url, args.users, args.searches, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark de sérialisation des endpoints de liste, sans base de données.
+
+Compare, par endpoint, le chemin FastAPI par défaut (validation par
+response_model, jsonable_encoder, json de la stdlib) au chemin rapide
+(lecture directe des lignes ORM, orjson).
+
+Usage:
+    python benchmarks/bench_serialization.py [--rows 100] [--iterations 200]
+        [--template-data-size 200]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse, rows_response
+from app.models import Document, DocumentStatus, DocumentType, Template, TemplateCategory, User
+from app.schemas.document import DocumentWithTemplate
+from app.schemas.template import TemplateWithUsage
+from app.schemas.user import User as UserSchema
+
+
+def make_rows(rows: int, template_data_size: int):
+    now = datetime.now(timezone.utc)
+    template_data = {
+        f"champ_{index}": {"valeur": f"Valeur {index}", "lignes": list(range(10))}
+        for index in range(template_data_size)
+    }
+    documents = []
+    for index in range(rows):
+        document = Document(
+            id=index, title=f"Devis {index}", document_type=DocumentType.DEVIS,
+            status=DocumentStatus.DRAFT, content="Contenu du document. " * 200,
+            template_data=template_data, user_id=1, template_id=1,
+            created_at=now, updated_at=now
+        )
+        document.template_name = "Devis standard"
+        documents.append(document)
+    templates = [
+        Template(
+            id=index, name=f"Template {index}", description="Description", category=TemplateCategory.FREELANCE,
+            template_content="{{ client.nom }} " * 200, variables_schema=template_data,
+            is_public=True, is_active=True, user_id=None, created_at=now, updated_at=now
+        )
+        for index in range(rows)
+    ]
+    users = [
+        User(id=index, email=f"user{index}@draftly.local", full_name=f"User {index}",
+             is_active=True, created_at=now, updated_at=now)
+        for index in range(rows)
+    ]
+    return {
+        "GET /documents": (documents, DocumentWithTemplate),
+        "GET /templates": (templates, TemplateWithUsage),
+        "GET /users": (users, UserSchema),
+    }
+
+
+def default_path(rows, schema) -> bytes:
+    # Équivalent de serialize_response de FastAPI avec response_model=List[schema]
+    validated = TypeAdapter(List[schema]).validate_python(rows, from_attributes=True)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def fast_path(rows, schema) -> bytes:
+    return rows_response(rows, schema).body
+
+
+def measure(func, rows, schema, iterations):
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        body = func(rows, schema)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--template-data-size", type=int, default=200, help="Clés de template_data par document")
+    args = parser.parse_args()
+
+    print(f"{args.rows} lignes par page, {FastJSONResponse.__name__} pour le chemin rapide")
+    for endpoint, (rows, schema) in make_rows(args.rows, args.template_data_size).items():
+        before, size = measure(default_path, rows, schema, args.iterations)
+        after, _ = measure(fast_path, rows, schema, args.iterations)
+        print(
+            f"{endpoint:<16} avant {before * 1000:8.2f} ms  après {after * 1000:8.2f} ms"
+            f"  (x{before / after:.1f}, {size / 1024:.0f} Ko)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,20 @@ from fastapi.staticfiles import StaticFiles
 import uvicorn
 
 from app.core.config import settings
+from app.core.database import get_pool_stats
+from app.core.responses import FastJSONResponse
+from app.core.security import password_hasher
 from app.api.api_v1.api import api_router
+from app.services.export_service import export_engine
+from app.services.llm_client import llm_client
+from app.services.write_buffer import draft_write_buffer
 
 app = FastAPI(
     title="Draftly API",
     description="API pour la génération de documents professionnels avec IA",
     version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=FastJSONResponse
 )
 
 # Configuration CORS
@@ -20,6 +27,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Document-Version", "X-Next-Cursor"],
 )
 
 # Inclusion des routes API
@@ -28,6 +36,20 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 # Montage des fichiers statiques
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+@app.on_event("startup")
+async def startup():
+    if settings.DRAFT_WRITE_BUFFER_ENABLED:
+        draft_write_buffer.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Écrire les brouillons encore en mémoire avant de fermer
+    await draft_write_buffer.stop()
+    # Attendre la fin des exports en cours
+    export_engine.shutdown()
+    password_hasher.shutdown()
+    await llm_client.close()
+
 @app.get("/")
 async def root():
     return {
@@ -40,6 +62,11 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/db")
+async def db_health_check():
+    """Occupation du pool de connexions et temps d'attente, par processus"""
+    return get_pool_stats()
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
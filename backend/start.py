@@ -160,6 +160,8 @@ def main():
     print("   uvicorn main:app --reload --host 0.0.0.0 --port 8000")
     print("\nOu utilisez le script:")
     print("   python -m uvicorn main:app --reload")
+    print("\nPour traiter les générations en arrière-plan:")
+    print("   python worker.py")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
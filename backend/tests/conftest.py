@@ -0,0 +1,45 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import pytest
+
+from app.models import Base, Document, DocumentType, User
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    """Base SQLite dans un fichier : plusieurs sessions peuvent s'y entrelacer"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    # Mêmes réglages que AsyncSessionLocal
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+async def user(db):
+    user = User(email="alice@draftly.local", full_name="Alice", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    return user
+
+
+@pytest.fixture
+async def document(db, user):
+    document = Document(
+        title="Devis", document_type=DocumentType.DEVIS,
+        content="Bonjour le monde", user_id=user.id
+    )
+    db.add(document)
+    await db.commit()
+    return document
@@ -0,0 +1,83 @@
+import pytest
+
+from app.models import Document
+from app.schemas.document import ContentOp, DocumentContentPatch
+from app.services.content_delta import DeltaError, VersionConflict, apply_ops, patch_content
+
+
+def insert(pos, text):
+    return ContentOp(op="insert", pos=pos, text=text)
+
+
+def delete(pos, length):
+    return ContentOp(op="delete", pos=pos, length=length)
+
+
+def test_apply_ops_in_sequence():
+    assert apply_ops("Bonjour le monde", [delete(8, 2), insert(8, "tout le")]) == "Bonjour tout le monde"
+
+
+def test_apply_ops_counts_utf16_units():
+    # L'emoji compte pour deux unités, comme String.length côté navigateur
+    assert apply_ops("a😀b", [insert(3, "!")]) == "a😀!b"
+    assert apply_ops("a😀b", [delete(1, 2)]) == "ab"
+
+
+@pytest.mark.parametrize("ops", [
+    [insert(4, "x")],
+    [delete(2, 2)],
+    [delete(2, 1)],  # Moitié d'une paire de substitution
+])
+def test_apply_ops_rejects_invalid_ops(ops):
+    with pytest.raises(DeltaError):
+        apply_ops("a😀", ops)
+
+
+async def test_patch_content_bumps_version(db, user, document):
+    result = await patch_content(db, document.id, user.id, DocumentContentPatch(
+        base_version=1, ops=[insert(0, "Re")]
+    ))
+
+    assert (result.version, result.length) == (2, 18)
+    row = (await db.execute(
+        Document.__table__.select().where(Document.id == document.id)
+    )).one()
+    assert (row.content, row.version) == ("ReBonjour le monde", 2)
+
+
+async def test_patch_content_unknown_document(db, user):
+    assert await patch_content(db, 999, user.id, DocumentContentPatch(base_version=1, ops=[])) is None
+
+
+async def test_patch_content_conflict_reports_current_version(db, user, document):
+    await patch_content(db, document.id, user.id, DocumentContentPatch(base_version=1, ops=[insert(0, "A")]))
+
+    with pytest.raises(VersionConflict) as conflict:
+        await patch_content(db, document.id, user.id, DocumentContentPatch(base_version=1, ops=[insert(0, "B")]))
+    assert conflict.value.version == 2
+
+
+async def test_stale_orm_write_still_moves_version(session_factory, user, document):
+    """
+    Une écriture ORM partie d'une copie lue avant un patch concurrent doit
+    quand même changer de version : un client resté sur la version du patch
+    reçoit un 409 au lieu d'appliquer ses opérations à un texte inconnu.
+    """
+    async with session_factory() as session_a, session_factory() as session_b:
+        stale = await session_a.get(Document, document.id)
+        assert stale.version == 1
+
+        patched = await patch_content(session_b, document.id, user.id, DocumentContentPatch(
+            base_version=1, ops=[insert(0, "patched ")]
+        ))
+        assert patched.version == 2
+
+        stale.content = "A overwrite"
+        await session_a.commit()
+        assert stale.version == 3
+
+        with pytest.raises(VersionConflict) as conflict:
+            await patch_content(session_b, document.id, user.id, DocumentContentPatch(
+                base_version=2, ops=[insert(0, "x")]
+            ))
+        assert conflict.value.version == 3
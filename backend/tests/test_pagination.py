@@ -0,0 +1,135 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import insert, literal_column, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models import Document, DocumentType, Template, TemplateCategory
+from app.services.document_listing import attach_template_names, full_query, summary_query
+from app.services.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page, split_page
+
+
+async def add_documents(db, user, created_at, count, **values):
+    """
+    Insère des documents à la même date de création, au format stocké par
+    CURRENT_TIMESTAMP sur SQLite (à la seconde)
+    """
+    for i in range(count):
+        await db.execute(insert(Document).values(
+            title=f"Document {i}", document_type=DocumentType.DEVIS, user_id=user.id,
+            created_at=literal_column(f"'{created_at}'"), **values
+        ))
+    await db.commit()
+
+
+async def read_all(db, query_for, model=Document, limit=2, full=False, max_pages=20):
+    """Parcourt toutes les pages en suivant les curseurs, comme un client"""
+    pages, cursor = [], None
+    for _ in range(max_pages):
+        query = keyset_page(query_for(), model, cursor, limit, db.bind.dialect.name)
+        rows = (await db.execute(query)).all()
+        if full:
+            rows = attach_template_names(rows)
+        rows, cursor = split_page(rows, limit)
+        pages.append(rows)
+        if cursor is None:
+            return pages
+    pytest.fail("Le curseur n'avance plus")
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 10, 0, 0, 123456, tzinfo=timezone.utc)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "pas-un-curseur", encode_cursor(datetime(2024, 5, 1), 1)[:-3]])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_sqlite_cursor_binds_stored_timestamp_format():
+    cursor = encode_cursor(datetime(2024, 5, 1, 10, 0, 0, 500000, tzinfo=timezone.utc), 7)
+    query = keyset_page(summary_query(1), Document, cursor, 20, "sqlite")
+    compiled = query.compile(dialect=sqlite.dialect())
+
+    assert "(documents.created_at, documents.id) < (?, ?)" in str(compiled)
+    # Chaîne comparée telle quelle à la colonne, sans microsecondes
+    assert "2024-05-01 10:00:00" in compiled.params.values()
+    assert 7 in compiled.params.values()
+
+
+def test_postgresql_cursor_binds_datetime():
+    created_at = datetime(2024, 5, 1, 10, 0, 0, 500000, tzinfo=timezone.utc)
+    query = keyset_page(summary_query(1), Document, encode_cursor(created_at, 7), 20, "postgresql")
+    compiled = query.compile(dialect=postgresql.dialect())
+
+    assert "(documents.created_at, documents.id) < (%(param_1)s, %(param_2)s)" in str(compiled)
+    assert compiled.params["param_1"] == created_at
+    assert compiled.params["param_2"] == 7
+    assert "ORDER BY documents.created_at DESC, documents.id DESC" in str(compiled)
+
+
+async def test_pages_split_ties_on_created_at(db, user):
+    # Tous créés dans la même seconde : seul l'id départage
+    await add_documents(db, user, "2024-05-01 10:00:00", 5)
+
+    pages = await read_all(db, lambda: summary_query(user.id))
+
+    ids = [row.id for page in pages for row in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == 5
+
+
+async def test_pages_continue_across_seconds(db, user):
+    await add_documents(db, user, "2024-05-01 10:00:01", 3)
+    await add_documents(db, user, "2024-05-01 10:00:00", 3)
+
+    pages = await read_all(db, lambda: summary_query(user.id))
+
+    rows = [row for page in pages for row in page]
+    assert len(rows) == 6
+    assert [row.created_at for row in rows] == sorted((row.created_at for row in rows), reverse=True)
+
+
+async def test_pages_ignore_updated_at_changes(db, user):
+    await add_documents(db, user, "2024-05-01 10:00:00", 4)
+    first = (await db.execute(keyset_page(summary_query(user.id), Document, None, 2))).all()
+    first, cursor = split_page(first, 2)
+
+    # Modifier les documents déjà vus ne les fait pas réapparaître
+    await db.execute(
+        update(Document)
+        .where(Document.id.in_([row.id for row in first]))
+        .values(updated_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    rest = (await db.execute(
+        keyset_page(summary_query(user.id), Document, cursor, 2, db.bind.dialect.name)
+    )).all()
+
+    assert {row.id for row in first}.isdisjoint(row.id for row in rest)
+    assert len(rest) == 2
+
+
+async def test_full_view_cursor_reads_joined_document(db, user):
+    template = Template(
+        name="Devis standard", category=TemplateCategory.FREELANCE,
+        template_content="{{ client }}", user_id=user.id
+    )
+    db.add(template)
+    await db.commit()
+    await add_documents(db, user, "2024-05-01 10:00:00", 2, template_id=template.id)
+    await add_documents(db, user, "2024-05-01 10:00:00", 3)
+
+    pages = await read_all(db, lambda: full_query(user.id), full=True)
+
+    documents = [document for page in pages for document in page]
+    assert all(isinstance(document, Document) for document in documents)
+    assert len({document.id for document in documents}) == 5
+    assert sorted(document.template_name for document in documents if document.template_name) == [
+        "Devis standard", "Devis standard"
+    ]
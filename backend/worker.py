@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Worker de génération IA pour Draftly Backend
+Traite les jobs de génération soumis par l'API (table generation_jobs)
+
+Usage:
+    python worker.py [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire courant au path Python
+sys.path.append(str(Path(__file__).parent))
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.services.ai_service import AIService
+from app.services.job_service import JobService
+from app.services.llm_client import LLMUserLimitExceeded
+from app.models.generation_job import GenerationJobStatus
+
+job_service = JobService()
+ai_service = AIService()
+
+
+async def with_session(func, *args):
+    """Exécute une opération de file avec sa propre session"""
+    async with AsyncSessionLocal() as db:
+        return await func(db, *args)
+
+
+async def run_job(job) -> str:
+    """Exécute un job réservé et retourne le contenu généré"""
+    payload = job.payload or {}
+    if job.job_type == "generate":
+        return await ai_service.generate_document_content(
+            template_content=payload.get("template_content", ""),
+            template_data=payload.get("template_data") or {},
+            document_type=payload["document_type"],
+            additional_context=payload.get("additional_context"),
+            bypass_cache=payload.get("bypass_cache", False),
+            user_id=job.user_id
+        )
+    raise ValueError(f"Type de job inconnu: {job.job_type}")
+
+
+async def idle(stop: asyncio.Event):
+    """Attend la prochaine scrutation de la file (ou l'arrêt)"""
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=settings.GENERATION_WORKER_POLL_INTERVAL)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def consume(worker_id: str, stop: asyncio.Event):
+    """Boucle d'une tâche du worker : réserve, exécute, enregistre"""
+    while not stop.is_set():
+        job = await with_session(job_service.claim, worker_id)
+
+        if job is None:
+            await idle(stop)
+            continue
+
+        try:
+            content = await run_job(job)
+        except LLMUserLimitExceeded:
+            # Plafond de générations de l'utilisateur : le job attend son tour
+            await with_session(job_service.postpone, job.id, job.worker_id)
+            await idle(stop)
+        except Exception as e:
+            print(f"❌ Job {job.id} en échec (tentative {job.attempts}): {e}")
+            await with_session(job_service.fail, job.id, job.worker_id, str(e))
+        else:
+            outcome = await with_session(job_service.complete, job.id, job.worker_id, content)
+            if outcome == GenerationJobStatus.COMPLETED:
+                print(f"✅ Job {job.id} terminé")
+            elif outcome == GenerationJobStatus.CONFLICTED:
+                print(f"⚠️  Job {job.id} terminé, document modifié entre-temps : résultat non appliqué")
+            else:
+                print(f"⚠️  Job {job.id} terminé après expiration du bail, résultat ignoré")
+
+
+async def reap(stop: asyncio.Event):
+    """Remet périodiquement en file les jobs abandonnés par un worker arrêté"""
+    while not stop.is_set():
+        requeued = await with_session(job_service.requeue_expired)
+        if requeued:
+            print(f"♻️  {requeued} job(s) remis en file")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=job_service.lease.total_seconds() / 2)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def main(concurrency: int):
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"🚀 Worker {worker_id} démarré ({concurrency} générations simultanées)")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    # Les jobs en cours sont menés à terme avant l'arrêt
+    await asyncio.gather(
+        reap(stop),
+        *(consume(worker_id, stop) for _ in range(concurrency))
+    )
+    await ai_service.client.close()
+    print("👋 Worker arrêté")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker de génération IA Draftly")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.GENERATION_WORKER_CONCURRENCY,
+        help="Nombre de générations traitées simultanément"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))